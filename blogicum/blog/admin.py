@@ -1,11 +1,38 @@
 from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 
-from .models import Category, Comment, Location, Post
+from .models import (
+    Category,
+    Comment,
+    Location,
+    Post,
+    category_table,
+    location_table,
+)
+from .services import bulk_delete
+from .utils import EstimatedCountPaginator
+
+User = get_user_model()
 
 # Указываем значение, которое будет отображаться в админке, если поле не задано
 admin.site.empty_value_display = "Не задано"
 
 
+class BulkDeleteMixin:
+    """
+    Удаление объектов (действие "Удалить выбранные" и кнопка на странице
+    объекта) через services.bulk_delete: без построчных сигналов,
+    с одним пересчётом счётчиков комментариев и сбросом кешей на пакет.
+    """
+
+    def delete_queryset(self, request, queryset):
+        bulk_delete(queryset)
+
+    def delete_model(self, request, obj):
+        bulk_delete(type(obj)._default_manager.filter(pk=obj.pk))
+
+
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
     """
@@ -31,7 +58,7 @@ class LocationAdmin(admin.ModelAdmin):
 
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(BulkDeleteMixin, admin.ModelAdmin):
     """
     Админ-класс для управления объектами модели Post.
     """
@@ -53,11 +80,64 @@ class PostAdmin(admin.ModelAdmin):
     )  # Поля, по которым выполняется поиск
     list_filter = ("is_published", "pub_date", "category", "location")  # Фильтры для списка объектов
     ordering = ("-pub_date",)  # Сортировка списка объектов
+    date_hierarchy = "pub_date"  # Переход по датам (индекс post_date_idx)
+    list_select_related = ("author",)  # Автор — тем же запросом, категория и место — из памяти
+    autocomplete_fields = ("author",)  # Поиск автора вместо списка всех пользователей
+    paginator = EstimatedCountPaginator  # Примерное число строк для большой таблицы
+    show_full_result_count = False  # Без второго COUNT(*) при поиске и фильтрах
+
+    def get_queryset(self, request):
+        """
+        Категории и местоположения строк подставляются из таблиц поиска;
+        текст и его HTML в списке не выводятся и, как в лентах, не читаются
+        (форма поста дочитывает текст отдельным запросом).
+        """
+        return super().get_queryset(request).defer("text", "text_html").with_lookups()
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        """
+        Варианты категорий и местоположений (в том числе для list_editable
+        в каждой строке списка) строятся один раз из таблиц поиска,
+        а не запросом на каждое поле.
+        """
+        formfield = super().formfield_for_foreignkey(db_field, request, **kwargs)
+        table = {"category": category_table, "location": location_table}.get(
+            db_field.name
+        )
+        if table is not None:
+            rows = sorted(table.current()[1].values(), key=str)
+            choices = [(row.pk, str(row)) for row in rows]
+            if formfield.empty_label is not None:
+                choices.insert(0, ("", formfield.empty_label))
+            formfield.choices = choices
+        return formfield
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(BulkDeleteMixin, admin.ModelAdmin):
     """
     Админ-класс для управления объектами модели Comment.
     """
     list_display = ("post", "author", "created_at")  # Поля, отображаемые в списке
+    date_hierarchy = "created_at"  # Переход по датам (индекс comment_created_idx)
+    list_select_related = ("post", "author")  # Пост и автор — тем же запросом
+    autocomplete_fields = ("post", "author")  # Поиск поста и автора вместо полных списков
+    paginator = EstimatedCountPaginator  # Примерное число строк для большой таблицы
+    show_full_result_count = False  # Без второго COUNT(*) при фильтрах
+
+    def get_queryset(self, request):
+        """
+        Текст поста в списке комментариев не нужен: выводится только заголовок.
+        """
+        return super().get_queryset(request).defer("post__text", "post__text_html")
+
+
+admin.site.unregister(User)
+
+
+@admin.register(User)
+class UserAdmin(BulkDeleteMixin, BaseUserAdmin):
+    """
+    Стандартная админка пользователей; удаление пользователя вместе
+    с его постами и комментариями — через bulk_delete.
+    """
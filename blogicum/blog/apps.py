@@ -12,4 +12,9 @@ class BlogConfig(AppConfig):
         """
         Инициализация приложения (например, подключение сигналов).
         """
+        import blog.checks  # noqa: F401 — проверка общего кеша.
         import blog.signals  # Импорт сигналов приложения.
+        from blog.cache import stats
+        from core.stats import register_stats_provider
+
+        register_stats_provider("blog_cache", stats)  # Счётчики кешей карточек и страниц в /stats/.
@@ -0,0 +1,126 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+
+from core.routers import replica_reads
+
+from .constants import COMMENTS_PER_PAGE, PAGINATOR
+from .forms import CommentForm
+from .models import Post
+from .utils import afinish_page, apaginate_feed, in_thread, page_number, page_slice
+from .views import (
+    get_base_post_queryset,
+    get_comments_queryset,
+    get_published_category,
+    render_category,
+    render_index,
+    render_post_detail,
+    render_profile,
+)
+
+# Асинхронные версии страниц чтения для запуска под ASGI (BLOG_ASYNC_VIEWS).
+# Независимые запросы страницы выполняются одновременно в потоках пула,
+# ответ (ETag, шаблон) собирается в потоке пула теми же функциями,
+# что и в синхронных представлениях.
+
+
+async def get_user(request):
+    """
+    Загружает пользователя запроса заранее: ленивый request.user читает
+    сессию из базы, а в асинхронном коде это запрещено.
+    """
+    await sync_to_async(lambda: request.user.is_authenticated)()
+    return request.user
+
+
+@replica_reads
+async def index(request):
+    """
+    Главная страница блога, отображает список постов.
+    """
+    page_obj = await apaginate_feed(
+        get_base_post_queryset(),
+        request,
+        PAGINATOR,
+        dependencies=[("feed", "index")],
+        index="post_visible_date_idx",
+    )
+    return await in_thread(render_index)(request, page_obj)
+
+
+@replica_reads
+async def category_posts(request, category_slug):
+    """
+    Страница категории. Категория берётся из таблицы поиска в памяти,
+    после чего число постов и строки страницы запрашиваются одновременно.
+    """
+    category = await in_thread(get_published_category)(category_slug)
+    page_obj = await apaginate_feed(
+        get_base_post_queryset().filter(category=category),
+        request,
+        PAGINATOR,
+        dependencies=[("category", category.pk), ("category_feed", category.pk)],
+    )
+    return await in_thread(render_category)(request, category, page_obj)
+
+
+@replica_reads
+async def profile_view(request, username):
+    """
+    Страница профиля: пользователь нужен для ключа числа постов,
+    затем число постов и строки страницы запрашиваются одновременно.
+    Владелец профиля видит и свои скрытые посты.
+    """
+    viewer = await get_user(request)
+    user = await in_thread(get_object_or_404)(User, username=username)
+    posts = Post.objects.filter(author=user)
+    if viewer != user:
+        posts = posts.filter(is_visible=True)
+    page_obj = await apaginate_feed(
+        posts.select_related("author").defer("text", "text_html").with_lookups(),
+        request,
+        PAGINATOR,
+        dependencies=[("user", user.pk), ("profile_feed", user.pk)],
+    )
+    return await in_thread(render_profile)(request, user, page_obj)
+
+
+@replica_reads
+async def post_detail(request, pk):
+    """
+    Страница поста: пост и страница его комментариев запрашиваются
+    одновременно; число комментариев берётся из Post.comment_count.
+    """
+    viewer = await get_user(request)
+    visible = Q(is_visible=True)
+    if viewer.is_authenticated:
+        visible |= Q(author=viewer)
+    posts = (
+        Post.objects.filter(visible)
+        .select_related("author")
+        .defer("text")
+        .with_lookups()
+    )
+    comments = get_comments_queryset(pk)
+    number = page_number(request)
+    post, rows = await asyncio.gather(
+        in_thread(posts.filter(pk=pk).first)(),
+        in_thread(page_slice)(comments, number, COMMENTS_PER_PAGE),
+    )
+    if post is None:
+        raise Http404("Пост не найден.")
+    paginator = Paginator(comments, COMMENTS_PER_PAGE)
+    paginator.count = post.comment_count  # Счётчик уже известен, COUNT(*) не нужен.
+    comments = await afinish_page(paginator, rows, number)
+    context = {
+        "post": post,
+        "object": post,
+        "form": CommentForm(),
+        "comments": comments,
+    }
+    return await in_thread(render_post_detail)(request, context)
@@ -0,0 +1,96 @@
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from django.db import connection, reset_queries
+from django.test.utils import (
+    CaptureQueriesContext,
+    setup_test_environment,
+    teardown_test_environment,
+)
+
+
+def percentile(values, percent):
+    """
+    Перцентиль по методу ближайшего ранга.
+    """
+    ordered = sorted(values)
+    rank = max(0, int(round(percent / 100 * len(ordered))) - 1)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+@contextmanager
+def test_database(keepdb=False, name=None):
+    """
+    Создаёт отдельную тестовую базу данных на время замеров,
+    чтобы синтетические данные не попадали в рабочую базу.
+    name задаёт файл базы (по умолчанию — база в памяти для SQLite).
+    """
+    setup_test_environment(debug=False)
+    if name is not None:
+        connection.settings_dict.setdefault("TEST", {})["NAME"] = name
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, keepdb=keepdb)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+        teardown_test_environment()
+
+
+def measure(request, repeat=20, prepare=None):
+    """
+    Замеряет запрос request() — вызываемый объект, возвращающий ответ.
+    prepare() (если задан) вызывается перед каждым запуском вне замера.
+    Первый запуск считается холодным, затем repeat тёплых запусков
+    по времени и один отдельный запуск под tracemalloc для пика памяти.
+    """
+    def run():
+        if prepare is not None:
+            prepare()
+        started = time.perf_counter()
+        response = request()
+        return response, (time.perf_counter() - started) * 1000
+
+    # Журнал запросов очищается сигналом request_started, поэтому перед
+    # замером он сбрасывается, чтобы смещения CaptureQueriesContext совпали.
+    reset_queries()
+    with CaptureQueriesContext(connection) as queries:
+        response, cold_ms = run()
+    query_count = len(queries)  # Считаем сразу: следующий запрос очистит журнал.
+    timings = [run()[1] for _ in range(repeat)]
+
+    if prepare is not None:
+        prepare()
+    tracemalloc.start()
+    try:
+        request()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "status": response.status_code,
+        "queries": query_count,
+        "cold_ms": round(cold_ms, 3),
+        "p50_ms": round(percentile(timings, 50), 3),
+        "p99_ms": round(percentile(timings, 99), 3),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def compare(previous, current):
+    """
+    Сравнивает два прогона и возвращает изменения по каждому маршруту.
+    """
+    changes = {}
+    for name, result in current.items():
+        before = previous.get(name)
+        if before is None:
+            continue
+        changes[name] = {
+            metric: round(result[metric] - before[metric], 3)
+            for metric in ("queries", "p50_ms", "p99_ms", "peak_kib")
+            if metric in before
+        }
+    return changes
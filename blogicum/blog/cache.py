@@ -0,0 +1,156 @@
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from threading import Lock
+
+from django.core.cache import cache
+
+VERSION_KEY = "blog:version:{kind}:{pk}"  # Ключ версии объекта в кеше.
+POST_CARD_KEY = "blog:post_card:{pk}:{versions}"  # Ключ отрендеренной карточки поста.
+POST_CARD_TIMEOUT = 60 * 60 * 24  # Время жизни карточки в кеше (сутки).
+FORM_KEY = "blog:form:{name}:{prefix}:{language}"  # Ключ отрендеренной пустой формы.
+FORM_TIMEOUT = 60 * 60 * 24  # Время жизни формы в кеше (сутки).
+
+_stats = Counter()  # Счётчики попаданий и промахов кеша в этом процессе.
+_stats_lock = Lock()
+
+
+def bump_version(kind, pk):
+    """
+    Сбрасывает версию объекта, делая недействительными все фрагменты,
+    закешированные с её участием.
+    Версия — время в наносекундах, поэтому после вытеснения ключа из кеша
+    старая версия не может повториться.
+    """
+    cache.set(VERSION_KEY.format(kind=kind, pk=pk), time.time_ns(), None)
+
+
+def bump_versions(*objects):
+    """
+    Сбрасывает версии пар (вид, pk) одним обращением к кешу —
+    для массовых операций, затрагивающих много объектов.
+    """
+    version = time.time_ns()
+    cache.set_many(
+        {VERSION_KEY.format(kind=kind, pk=pk): version for kind, pk in objects},
+        None,
+    )
+
+
+def get_versions(*objects):
+    """
+    Возвращает версии для пар (вид, pk) одним обращением к кешу.
+    Отсутствующие версии создаются.
+    """
+    keys = [VERSION_KEY.format(kind=kind, pk=pk) for kind, pk in objects]
+    versions = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def bumped_since(moment, *objects):
+    """
+    Сбрасывалась ли версия какой-либо из пар (вид, pk) начиная
+    с moment (time.time_ns()). Отсутствующие версии не создаются:
+    их никто не сбрасывал.
+    """
+    keys = [VERSION_KEY.format(kind=kind, pk=pk) for kind, pk in objects]
+    return any(version >= moment for version in cache.get_many(keys).values())
+
+
+def post_dependencies(post):
+    """
+    Объекты, от которых зависит отображение поста: сам пост, автор,
+    категория и местоположение — в виде пар (вид, pk) для get_versions.
+    """
+    return [
+        ("post", post.pk),
+        ("user", post.author_id),
+        ("category", post.category_id),
+        ("location", post.location_id),
+    ]
+
+
+def feed_dependencies(post):
+    """
+    Ленты, в которых может появиться или из которых может пропасть пост:
+    главная, лента категории и профиль автора.
+    """
+    return [
+        ("feed", "index"),
+        ("category_feed", post.category_id),
+        ("profile_feed", post.author_id),
+    ]
+
+
+def add_page_dependencies(request, *objects):
+    """
+    Запоминает в запросе пары (вид, pk), от которых зависит страница.
+    По ним кеш страниц (blog.middleware.AnonymousPageCacheMiddleware)
+    проверяет, не устарела ли сохранённая копия.
+    """
+    if not hasattr(request, "page_dependencies"):
+        request.page_dependencies = []
+    request.page_dependencies.extend(objects)
+
+
+def post_card_key(post):
+    """
+    Ключ карточки поста: id поста и версии поста, автора, категории и локации.
+    Ключ запоминается в объекте поста, чтобы в одном запросе не обращаться
+    к кешу версий повторно (он же используется для ETag страниц).
+    """
+    if getattr(post, "_card_key", None):
+        return post._card_key
+    versions = get_versions(*post_dependencies(post))
+    post._card_versions = versions
+    post._card_key = POST_CARD_KEY.format(
+        pk=post.pk, versions="-".join(map(str, versions))
+    )
+    return post._card_key
+
+
+def post_versions(post):
+    """
+    Версии поста, автора, категории и локации — те же, что в ключе
+    карточки (post_card_key), без повторного обращения к кешу.
+    """
+    post_card_key(post)
+    return post._card_versions
+
+
+def version_time(versions):
+    """
+    Время последнего сброса среди versions как datetime (UTC) или None
+    для пустого списка. Версии сбрасываются при каждом изменении,
+    от которого зависят ключи и ETag, и только растут, поэтому время
+    годится для Last-Modified.
+    """
+    if not versions:
+        return None
+    return datetime.fromtimestamp(max(versions) / 1e9, tz=timezone.utc)
+
+
+def record(name, hit):
+    """
+    Учитывает попадание или промах кеша фрагментов с именем name.
+    """
+    with _stats_lock:
+        _stats[f"{name}_{'hits' if hit else 'misses'}"] += 1
+
+
+def stats():
+    """
+    Возвращает счётчики попаданий и промахов кешей и доли попаданий.
+    """
+    with _stats_lock:
+        result = dict(_stats)
+    names = {key.rsplit("_", 1)[0] for key in result}
+    for name in names:
+        hits = result.get(f"{name}_hits", 0)
+        total = hits + result.get(f"{name}_misses", 0)
+        result[f"{name}_hit_ratio"] = round(hits / total, 3)
+    return result
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+# Бэкенды кеша, данные которых видит только текущий процесс.
+PROCESS_LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+@register()
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Предупреждает, если кеш default не общий для процессов: версии
+    blog.cache сбрасываются в одном процессе, и остальные продолжают
+    отдавать устаревшие таблицы поиска, карточки, счётчики и ленты.
+    """
+    backend = settings.CACHES.get("default", {}).get("BACKEND")
+    if settings.DEBUG or backend not in PROCESS_LOCAL_CACHES:
+        return []
+    return [
+        Warning(
+            f"Кеш default ({backend}) не общий для процессов сервера.",
+            hint=(
+                "Версии кеша блога сбрасываются только в процессе, изменившем "
+                "данные. Задайте BLOGICUM_MEMCACHED или BLOGICUM_CACHE_DIR "
+                "либо запускайте сервер одним процессом."
+            ),
+            id="blog.W001",
+        )
+    ]
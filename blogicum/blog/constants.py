@@ -3,3 +3,17 @@ HELP_CATEGORY = "символы латиницы, цифры, дефис и по
 HELP_POST = "можно делать отложенные публикации."
 MAX_LEN = 30
 PAGINATOR = 10
+PAGINATION_MODE = "cursor"  # "cursor" — курсорная пагинация, "numbered" — с номерами страниц.
+COMMENTS_PER_PAGE = 100  # Количество комментариев на странице поста.
+SEARCH_MAX_RESULTS = 200  # Сколько лучших совпадений поиска показывать.
+IMAGE_WIDTHS = (320, 640, 1280)  # Ширины уменьшенных копий изображений постов.
+IMAGE_QUALITY = 80  # Качество сжатия уменьшенных копий (WebP/JPEG).
+ORIGINAL_IMAGE_QUALITY = 95  # Качество пересохранения оригинала без метаданных.
+IMAGE_RETRY_TIMEOUT = 60 * 60  # Через сколько секунд повторять обработку, которая не удалась.
+HTTP_CACHE_MAX_AGE = 60  # Сколько секунд браузеры и прокси могут хранить страницы для анонимов.
+FEED_ITEMS = 20  # Сколько последних постов попадает в RSS/Atom/JSON-ленту.
+EXCERPT_WORDS = 60  # Длина сохранённого анонса поста в словах (лента RSS; карточки сокращают его).
+ESTIMATED_COUNT_THRESHOLD = 10_000  # С какого размера таблицы списки показывают примерное число строк.
+PAGE_WINDOW = 2  # Сколько номеров страниц показывать по обе стороны от текущей.
+LOOKUP_MISS_TIMEOUT = 5  # Сколько секунд помнить отсутствующую запись таблицы поиска и не перечитывать таблицу.
+LOOKUP_MISSES_LIMIT = 1000  # Сколько отсутствующих ключей таблицы поиска помнить.
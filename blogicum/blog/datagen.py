@@ -0,0 +1,227 @@
+import random
+from bisect import bisect
+from collections import Counter
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.utils.timezone import now
+from faker import Faker
+
+from core.db import analyze
+
+from .models import (
+    Category,
+    Comment,
+    Location,
+    Post,
+    make_excerpt,
+    render_text_html,
+)
+
+User = get_user_model()
+
+
+def zipf_weights(size, skew):
+    """
+    Накопленные веса распределения Ципфа для size элементов:
+    элемент с рангом k выбирается с вероятностью ~ 1 / k ** skew.
+    """
+    return list(accumulate(1 / rank ** skew for rank in range(1, size + 1)))
+
+
+def zipf_counts(total, size, skew, rng):
+    """
+    Распределяет total событий по size элементам по закону Ципфа.
+    """
+    cum_weights = zipf_weights(size, skew)
+    top = cum_weights[-1]
+    return Counter(
+        bisect(cum_weights, rng.random() * top) for _ in range(total)
+    )
+
+
+def next_pk(model):
+    """
+    Первичный ключ для следующей вставляемой записи.
+    bulk_create на SQLite не возвращает id, поэтому ключи задаются явно.
+    """
+    last = model.objects.order_by("-pk").values_list("pk", flat=True).first()
+    return (last or 0) + 1
+
+
+def insert_rows(model, fields, rows, batch_size):
+    """
+    Вставляет кортежи значений полей fields пакетами executemany,
+    не создавая объекты модели: на миллионах строк подготовка объектов
+    и компиляция INSERT в bulk_create занимают большую часть времени.
+    Значения должны быть уже приведены к формату базы, сигналы
+    не отправляются.
+    """
+    quote = connection.ops.quote_name
+    columns = ", ".join(quote(model._meta.get_field(field).column) for field in fields)
+    sql = (
+        f"INSERT INTO {quote(model._meta.db_table)} ({columns}) "
+        f"VALUES ({', '.join(['%s'] * len(fields))})"
+    )
+    batch = []
+    with connection.cursor() as cursor:
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                cursor.executemany(sql, batch)
+                batch = []
+        if batch:
+            cursor.executemany(sql, batch)
+
+
+def generate(
+    users=50,
+    categories=10,
+    locations=10,
+    posts=10_000,
+    comments=50_000,
+    skew=1.1,
+    seed=0,
+    batch_size=5000,
+    scheduled=0.0,
+    unpublished_categories=0.0,
+):
+    """
+    Заполняет базу синтетическими данными: пользователи, категории
+    и местоположения — пакетными bulk_create, посты и комментарии —
+    через insert_rows.
+    Посты распределяются по авторам, а комментарии по постам по закону
+    Ципфа. Доля scheduled постов получает дату публикации в будущем
+    (и не комментируется), доля unpublished_categories категорий снята
+    с публикации. Post.comment_count и Post.is_visible заполняются сразу,
+    без сигналов. В конце обновляется статистика базы (core.db.analyze).
+    Результат детерминирован при одинаковом seed.
+    Возвращает словарь с количеством созданных записей.
+    """
+    rng = random.Random(seed)
+    fake = Faker("ru_RU")
+    fake.seed_instance(seed)
+    sentences = [fake.sentence(nb_words=8) for _ in range(500)]
+    names = [(fake.first_name(), fake.last_name()) for _ in range(200)]
+    moment = now()
+
+    user_pk = next_pk(User)
+    batch = []
+    for i in range(users):
+        first_name, last_name = rng.choice(names)
+        batch.append(
+            User(
+                pk=user_pk + i,
+                username=f"user{user_pk + i}",
+                first_name=first_name,
+                last_name=last_name,
+                password="!",
+            )
+        )
+    User.objects.bulk_create(batch, batch_size=batch_size)
+    category_pk = next_pk(Category)
+    hidden = set(rng.sample(range(categories), round(categories * unpublished_categories)))
+    Category.objects.bulk_create(
+        [
+            Category(
+                pk=category_pk + i,
+                title=fake.word().capitalize(),
+                description=rng.choice(sentences),
+                slug=f"category-{category_pk + i}",
+                is_published=i not in hidden,
+            )
+            for i in range(categories)
+        ]
+    )
+    location_pk = next_pk(Location)
+    Location.objects.bulk_create(
+        [Location(pk=location_pk + i, name=fake.city()) for i in range(locations)]
+    )
+
+    authors = zipf_counts(posts, users, skew, rng)
+    author_ids = [
+        user_pk + index for index, count in sorted(authors.items())
+        for _ in range(count)
+    ]
+    rng.shuffle(author_ids)
+    # Отложенные посты — последние по номеру: комментарии распределяются
+    # только между уже опубликованными.
+    published = posts - round(posts * scheduled)
+    per_post = zipf_counts(comments, published, skew, rng)
+    post_pk = next_pk(Post)
+    pub_dates = {}
+    adapt = connection.ops.adapt_datetimefield_value
+
+    def post_rows():
+        created_at = adapt(moment)
+        for index, author_id in enumerate(author_ids):
+            if index < published:
+                pub_date = moment - timedelta(seconds=rng.randrange(365 * 24 * 3600))
+            else:
+                pub_date = moment + timedelta(seconds=rng.randrange(1, 30 * 24 * 3600))
+            if per_post.get(index):
+                pub_dates[index] = pub_date
+            category = rng.randrange(categories)
+            text = " ".join(rng.choices(sentences, k=rng.randint(3, 30)))
+            yield (
+                post_pk + index,
+                rng.choice(sentences)[:256],
+                text,
+                make_excerpt(text),
+                render_text_html(text),
+                adapt(pub_date),
+                author_id,
+                category_pk + category,
+                location_pk + rng.randrange(locations),
+                per_post.get(index, 0),
+                True,
+                index < published and category not in hidden,
+                created_at,
+                created_at,
+            )
+
+    def comment_rows():
+        for index, count in per_post.items():
+            age = max(int((moment - pub_dates[index]).total_seconds()), 1)
+            for _ in range(count):
+                yield (
+                    post_pk + index,
+                    user_pk + rng.randrange(users),
+                    rng.choice(sentences),
+                    adapt(moment - timedelta(seconds=rng.randrange(age))),
+                )
+
+    insert_rows(
+        Post,
+        [
+            "id",
+            "title",
+            "text",
+            "excerpt",
+            "text_html",
+            "pub_date",
+            "author",
+            "category",
+            "location",
+            "comment_count",
+            "is_published",
+            "is_visible",
+            "created_at",
+            "updated_at",
+        ],
+        post_rows(),
+        batch_size,
+    )
+    insert_rows(
+        Comment, ["post", "author", "text", "created_at"], comment_rows(), batch_size
+    )
+    analyze()  # Статистика для планировщика и оценки числа строк.
+    return {
+        "users": users,
+        "categories": categories,
+        "locations": locations,
+        "posts": posts,
+        "comments": comments,
+    }
@@ -0,0 +1,316 @@
+import hashlib
+import json
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed, SyndicationFeed
+from django.utils.http import http_date, quote_etag
+
+from core.routers import replica_reads
+
+from .cache import bumped_since, get_versions, post_dependencies, record
+from .constants import FEED_ITEMS, HTTP_CACHE_MAX_AGE
+from .views import get_base_post_queryset, get_published_category
+
+FEED_KEY = "blog:syndication:{scope}"  # Ключ состояния ленты в кеше.
+FEED_TIMEOUT = 60 * 60 * 24  # Время жизни состояния ленты в кеше (сутки).
+
+# Синдикационные ленты (RSS, Atom, JSON Feed) главной, категорий и авторов.
+# В кеше по каждой ленте хранится состояние: заголовок, последние
+# FEED_ITEMS постов в виде словарей, зависимости с их версиями,
+# время сборки или последнего обновления (для Last-Modified)
+# и уже сериализованные тела ответов по форматам.
+#
+# Состояние зависит от версии ленты (feed/category_feed/profile_feed)
+# и версий каждого поста (blog.cache.post_dependencies), поэтому удаление,
+# скрытие поста или смена видимости категории приводят к пересборке
+# (один запрос постов и, для категории и автора, один запрос владельца).
+# Когда же пост становится видимым или меняется видимый пост, сигналы
+# вызывают update_feeds: пост вставляется в сохранённый список без
+# перечитывания ленты, а тела ответов сериализуются заново из кеша.
+
+
+class JSONFeed(SyndicationFeed):
+    """
+    JSON Feed 1.1 (https://jsonfeed.org/version/1.1).
+    """
+
+    content_type = "application/feed+json; charset=utf-8"
+
+    def write(self, outfile, encoding):
+        feed = {
+            "version": "https://jsonfeed.org/version/1.1",
+            "title": self.feed["title"],
+            "home_page_url": self.feed["link"],
+            "feed_url": self.feed["feed_url"],
+            "description": self.feed["description"],
+            "language": self.feed["language"],
+            "items": [
+                {
+                    "id": item["unique_id"],
+                    "url": item["link"],
+                    "title": item["title"],
+                    "content_text": item["description"],
+                    "date_published": item["pubdate"].isoformat(),
+                    "date_modified": item["updateddate"].isoformat(),
+                    "authors": [{"name": item["author_name"]}],
+                    "tags": list(item["categories"]),
+                }
+                for item in self.items
+            ],
+        }
+        outfile.write(json.dumps(feed, ensure_ascii=False))
+
+
+FORMATS = {
+    "rss": Rss201rev2Feed,
+    "atom": Atom1Feed,
+    "json": JSONFeed,
+}
+
+
+def feed_item(post):
+    """
+    Данные поста для ленты. Ссылки хранятся путями: адрес сайта
+    подставляется при сериализации.
+    """
+    return {
+        "id": post.pk,
+        "title": post.title,
+        "path": post.get_absolute_url(),
+        "description": post.excerpt,
+        "author": post.author.get_username(),
+        "category": post.category.title,
+        "pubdate": post.pub_date,
+        "updated": post.updated_at,
+        "dependencies": post_dependencies(post),
+    }
+
+
+def post_scopes(post):
+    """
+    Ленты, в которые попадает видимый пост.
+    """
+    return [
+        "index",
+        f"category:{post.category.slug}",
+        f"profile:{post.author.get_username()}",
+    ]
+
+
+def state_dependencies(state):
+    return [
+        state["feed"],
+        *state["owner"],
+        *(pair for item in state["items"] for pair in item["dependencies"]),
+    ]
+
+
+def is_fresh(state, previous=None):
+    """
+    Проверяет версии зависимостей состояния. previous — {пара: версия
+    до сброса} для пар, которые вызывающий только что сбросил сам:
+    для них сохранённая версия сравнивается с версией до сброса, так что
+    состояние, устаревшее ещё до этого сброса, свежим не считается.
+    """
+    previous = previous or {}
+    pairs = [pair for pair in state["dependencies"] if pair not in previous]
+    current = dict(zip(pairs, get_versions(*pairs)))
+    return all(
+        version == previous.get(pair, current.get(pair))
+        for pair, version in zip(state["dependencies"], state["versions"])
+    )
+
+
+def store(key, state, started=None):
+    """
+    Запоминает версии зависимостей и время изменения и сохраняет состояние
+    без тел ответов. Время только растёт, даже если пост пропал из ленты,
+    в отличие от updated_at её постов.
+    Если версия сброшена после started (во время сборки), состояние
+    могло устареть и не сохраняется; версии, которых ещё не было,
+    создаются и сохранению не мешают. Возвращает True, если сохранено.
+    """
+    state["dependencies"] = state_dependencies(state)
+    stale = started is not None and bumped_since(started, *state["dependencies"])
+    state["versions"] = get_versions(*state["dependencies"])
+    state["modified"] = max(state.get("modified", 0), time.time_ns())
+    state["bodies"] = {}
+    if stale:
+        return False
+    cache.set(key, state, FEED_TIMEOUT)
+    return True
+
+
+def get_state(scope, build):
+    """
+    Возвращает ключ и состояние ленты из кеша или собирает его функцией
+    build. Вместо ключа возвращается None, если состояние не сохранено.
+    """
+    key = FEED_KEY.format(scope=scope)
+    state = cache.get(key)
+    if state is not None and is_fresh(state):
+        record("syndication", True)
+        return key, state
+    record("syndication", False)
+    started = time.time_ns()
+    state = build()
+    return key if store(key, state, started) else None, state
+
+
+def serialize(request, state, fmt):
+    """
+    Сериализует состояние ленты в формат fmt.
+    """
+    feed = FORMATS[fmt](
+        title=state["title"],
+        link=request.build_absolute_uri(state["path"]),
+        description=state["description"],
+        language=settings.LANGUAGE_CODE,
+        feed_url=request.build_absolute_uri(request.path),
+    )
+    for item in state["items"]:
+        link = request.build_absolute_uri(item["path"])
+        feed.add_item(
+            title=item["title"],
+            link=link,
+            description=item["description"],
+            author_name=item["author"],
+            pubdate=item["pubdate"],
+            updateddate=item["updated"],
+            unique_id=link,
+            categories=[item["category"]],
+        )
+    return feed.writeString("utf-8").encode("utf-8")
+
+
+def respond(request, fmt, scope, build):
+    """
+    Отдаёт ленту с учётом If-None-Match/If-Modified-Since.
+    Тело берётся из состояния в кеше; при его отсутствии
+    сериализуется и сохраняется вместе с состоянием.
+    """
+    if fmt not in FORMATS:
+        raise Http404("Неизвестный формат ленты.")
+    key, state = get_state(scope, build)
+    base = request.build_absolute_uri("/")
+    etag = quote_etag(
+        hashlib.md5(repr([fmt, base, state["versions"]]).encode()).hexdigest()
+    )
+    timestamp = state["modified"] // 10**9  # Целые секунды, как в If-Modified-Since.
+
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None:
+        body = state["bodies"].get((fmt, base))
+        if body is None:
+            body = state["bodies"][(fmt, base)] = serialize(request, state, fmt)
+            if key is not None:
+                cache.set(key, state, FEED_TIMEOUT)
+        response = HttpResponse(body, content_type=FORMATS[fmt].content_type)
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(timestamp)
+    patch_cache_control(response, public=True, max_age=HTTP_CACHE_MAX_AGE)
+    return response
+
+
+def latest(posts):
+    return [
+        feed_item(post) for post in posts.order_by("-pub_date", "-id")[:FEED_ITEMS]
+    ]
+
+
+@replica_reads
+def index_feed(request, fmt):
+    """
+    Лента последних постов блога.
+    """
+    def build():
+        return {
+            "title": "Блогикум",
+            "description": "Новые публикации Блогикума.",
+            "path": reverse("blog:index"),
+            "feed": ("feed", "index"),
+            "owner": [],
+            "items": latest(get_base_post_queryset()),
+        }
+
+    return respond(request, fmt, "index", build)
+
+
+@replica_reads
+def category_feed(request, fmt, category_slug):
+    """
+    Лента последних постов категории.
+    """
+    def build():
+        category = get_published_category(category_slug)
+        return {
+            "title": f"Блогикум — {category.title}",
+            "description": category.description,
+            "path": reverse("blog:category_posts", args=[category.slug]),
+            "feed": ("category_feed", category.pk),
+            "owner": [("category", category.pk)],
+            "items": latest(get_base_post_queryset().filter(category=category)),
+        }
+
+    return respond(request, fmt, f"category:{category_slug}", build)
+
+
+@replica_reads
+def profile_feed(request, fmt, username):
+    """
+    Лента последних опубликованных постов автора.
+    """
+    def build():
+        user = get_object_or_404(User, username=username)
+        return {
+            "title": f"Блогикум — {user.get_username()}",
+            "description": f"Публикации пользователя {user.get_username()}.",
+            "path": reverse("blog:profile", args=[user.get_username()]),
+            "feed": ("profile_feed", user.pk),
+            "owner": [("user", user.pk)],
+            "items": latest(get_base_post_queryset().filter(author=user)),
+        }
+
+    return respond(request, fmt, f"profile:{username}", build)
+
+
+def update_feeds(post_ids, previous):
+    """
+    Вставляет посты, ставшие видимыми или изменённые, в закешированные
+    ленты одним запросом, не пересобирая ленты целиком.
+    Вызывается сигналами после сброса версий постов и лент; previous —
+    версии этих пар до сброса (см. is_fresh). Лента, устаревшая по другой
+    причине (например, после повторной публикации категории), не
+    дополняется, а пересобирается при следующем запросе.
+    Ленты, из которых пост пропал (скрыт, перенесён в другую категорию),
+    не затрагиваются: их состояние устаревает по версии поста
+    и пересобирается при следующем запросе.
+    """
+    post_ids = set(post_ids)
+    posts = get_base_post_queryset().filter(pk__in=post_ids)
+    new_items = defaultdict(list)
+    for post in posts:
+        item = feed_item(post)
+        for scope in post_scopes(post):
+            new_items[scope].append(item)
+
+    for scope, items in new_items.items():
+        key = FEED_KEY.format(scope=scope)
+        state = cache.get(key)
+        if state is None or not is_fresh(state, previous):
+            continue
+        kept = [item for item in state["items"] if item["id"] not in post_ids]
+        state["items"] = sorted(
+            kept + items,
+            key=lambda item: (item["pubdate"], item["id"]),
+            reverse=True,
+        )[:FEED_ITEMS]
+        store(key, state)
@@ -0,0 +1,177 @@
+import logging
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from threading import Lock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection
+from PIL import Image, ImageOps
+
+from .cache import bump_version
+from .constants import (
+    IMAGE_QUALITY,
+    IMAGE_RETRY_TIMEOUT,
+    IMAGE_WIDTHS,
+    ORIGINAL_IMAGE_QUALITY,
+)
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {"webp": "WEBP", "jpeg": "JPEG"}  # Расширение уменьшенной копии -> формат Pillow.
+ORIGINAL_FORMATS = ("JPEG", "PNG", "WEBP")  # Форматы оригиналов, очищаемых от метаданных.
+FAILED_KEY = "blog:image_failed:{name}"  # Отметка о неудачной обработке изображения.
+
+_executor = None
+_pending = set()  # Изображения, для которых генерация уже поставлена в очередь.
+_lock = Lock()
+
+
+def target_widths(width):
+    """
+    Ширины уменьшенных копий для изображения шириной width:
+    копии крупнее оригинала не создаются, вместо них берётся ширина оригинала.
+    """
+    widths = [size for size in IMAGE_WIDTHS if size < width]
+    if len(widths) < len(IMAGE_WIDTHS):
+        widths.append(width)
+    return widths
+
+
+def derivative_name(name, width, extension):
+    """
+    Путь уменьшенной копии в хранилище: thumbs/<имя без расширения>/<ширина>.<формат>.
+    """
+    stem = posixpath.splitext(name)[0]
+    return f"thumbs/{stem}/{width}.{extension}"
+
+
+def derivatives(name, width):
+    """
+    Все уменьшенные копии изображения: {расширение: [(ширина, путь), ...]}.
+    """
+    return {
+        extension: [
+            (size, derivative_name(name, size, extension))
+            for size in target_widths(width)
+        ]
+        for extension in FORMATS
+    }
+
+
+def strip_metadata(file):
+    """
+    Пересохраняет загруженный оригинал без метаданных (EXIF с координатами,
+    ICC, комментарии), применив ориентацию из EXIF к пикселям.
+    Возвращает (ContentFile, ширина, высота) или None для форматов
+    не из ORIGINAL_FORMATS (например, анимированных GIF).
+    """
+    file.seek(0)
+    image = Image.open(file)
+    image_format = image.format
+    if image_format not in ORIGINAL_FORMATS:
+        file.seek(0)
+        return None
+    image = ImageOps.exif_transpose(image)
+    image.info = {}  # Pillow берёт EXIF и ICC для записи из info.
+    options = {"quality": ORIGINAL_IMAGE_QUALITY} if image_format != "PNG" else {}
+    buffer = BytesIO()
+    image.save(buffer, image_format, **options)
+    return ContentFile(buffer.getvalue()), image.width, image.height
+
+
+def generate_derivatives(name):
+    """
+    Создаёт недостающие уменьшенные копии изображения в форматах WebP и JPEG.
+    Копии сохраняются без метаданных (EXIF, ICC и т. п.), ориентация
+    из EXIF применяется к пикселям заранее.
+    Возвращает размеры оригинала (ширина, высота).
+    """
+    with default_storage.open(name) as file:
+        original = ImageOps.exif_transpose(Image.open(file))
+        original.load()
+    rgb = original.convert("RGB")
+    for extension, items in derivatives(name, original.width).items():
+        for width, path in items:
+            if default_storage.exists(path):
+                continue
+            height = round(original.height * width / original.width)
+            resized = rgb.resize((width, height), Image.Resampling.LANCZOS)
+            buffer = BytesIO()
+            resized.save(buffer, FORMATS[extension], quality=IMAGE_QUALITY)
+            default_storage.save(path, ContentFile(buffer.getvalue()))
+    return original.width, original.height
+
+
+def process_post_image(post_id, name):
+    """
+    Задача пула: создаёт копии, сохраняет размеры и сбрасывает кеш карточки.
+    """
+    from .models import Post
+
+    try:
+        width, height = generate_derivatives(name)
+        Post.objects.filter(pk=post_id, image=name).update(
+            image_width=width, image_height=height
+        )
+        bump_version("post", post_id)
+    except Exception:
+        # Отметка останавливает повторную постановку в очередь на каждом
+        # показе (например, если оригинал удалён из хранилища).
+        cache.set(FAILED_KEY.format(name=name), True, IMAGE_RETRY_TIMEOUT)
+        logger.exception("Не удалось обработать изображение %s", name)
+    finally:
+        connection.close()  # Соединение потока пула не переиспользуется запросами.
+        with _lock:
+            _pending.discard(name)
+
+
+def schedule(post_id, name):
+    """
+    Ставит обработку изображения в пул потоков вне цикла запроса.
+    Повторная постановка уже ожидающего изображения игнорируется, как и
+    изображения, обработка которого не удалась меньше IMAGE_RETRY_TIMEOUT
+    секунд назад.
+    """
+    global _executor
+    with _lock:
+        if name in _pending:
+            return
+        if cache.get(FAILED_KEY.format(name=name)):
+            return
+        _pending.add(name)
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, "IMAGE_WORKERS", 2),
+                thread_name_prefix="blog-images",
+            )
+    _executor.submit(process_post_image, post_id, name)
+
+
+def responsive_sources(post):
+    """
+    Возвращает {расширение: srcset} для изображения поста или None,
+    если копий ещё нет; в этом случае их генерация ставится в очередь,
+    а шаблон показывает оригинал.
+    """
+    name = post.image.name
+    if not post.image_width:
+        schedule(post.pk, name)
+        return None
+    sources = derivatives(name, post.image_width)
+    if not all(
+        default_storage.exists(path)
+        for items in sources.values()
+        for _, path in items
+    ):
+        schedule(post.pk, name)
+        return None
+    return {
+        extension: ", ".join(
+            f"{default_storage.url(path)} {width}w" for width, path in items
+        )
+        for extension, items in sources.items()
+    }
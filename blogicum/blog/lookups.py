@@ -0,0 +1,124 @@
+import time
+from threading import Lock
+
+from django.db import transaction
+
+from core.routers import PRIMARY
+
+from .cache import bump_version, get_versions
+from .constants import LOOKUP_MISS_TIMEOUT, LOOKUP_MISSES_LIMIT
+
+# Таблицы поиска в памяти процесса для маленьких, редко меняющихся
+# справочников (категории, местоположения). Таблица загружается целиком
+# одним запросом и помечается версией из общего кеша; изменение
+# справочника сбрасывает версию (invalidate), и каждый процесс
+# перечитывает таблицу при следующем обращении.
+
+
+class LookupTable:
+    """
+    Записи модели по id и (если задан slug_field) по слагу.
+    """
+
+    def __init__(self, model, name, slug_field=None):
+        self.model = model
+        self.name = name
+        self.slug_field = slug_field
+        self._lock = Lock()
+        self._data = (None, {}, {})  # (версия, по id, по слагу)
+        self._loaded_at = 0.0  # time.monotonic() последней загрузки.
+        self._misses = {}  # (индекс, ключ) -> до какого момента считать отсутствующим
+
+    @property
+    def dependency(self):
+        return ("lookup", self.name)
+
+    def refresh(self, version):
+        """
+        Перечитывает таблицу из основной базы: реплика может отставать
+        от уже сброшенной версии.
+        """
+        with self._lock:
+            if self._data[0] == version:
+                return self._data
+            return self.load(version)
+
+    def load(self, version):
+        """
+        Загружает таблицу (вызывается под self._lock).
+        """
+        rows = list(self.model._default_manager.using(PRIMARY).all())
+        by_slug = {}
+        if self.slug_field:
+            by_slug = {getattr(row, self.slug_field): row for row in rows}
+        self._data = (version, {row.pk: row for row in rows}, by_slug)
+        self._loaded_at = time.monotonic()
+        self._misses = {}
+        return self._data
+
+    def current(self, version=None):
+        """
+        Таблица актуальной версии; version можно передать, если она
+        уже получена (см. attach_lookups).
+        """
+        if version is None:
+            version = get_versions(self.dependency)[0]
+        data = self._data
+        if data[0] != version:
+            data = self.refresh(version)
+        return data
+
+    def reload_missing(self, index, key):
+        """
+        Перечитывает таблицу, если записи нет: её могли создать
+        пакетно (bulk_create), без сигналов и сброса версии.
+        Отсутствующий ключ запоминается на LOOKUP_MISS_TIMEOUT секунд,
+        и таблица перечитывается не чаще раза в этот срок, чтобы
+        запросы с несуществующими слагами не читали её каждый раз.
+        """
+        moment = time.monotonic()
+        with self._lock:
+            if self._misses.get((index, key), 0) > moment:
+                return None
+            data = self._data
+            if moment - self._loaded_at >= LOOKUP_MISS_TIMEOUT:
+                data = self.load(data[0])
+            row = data[index].get(key)
+            if row is None:
+                if len(self._misses) >= LOOKUP_MISSES_LIMIT:
+                    self._misses = {}
+                self._misses[(index, key)] = moment + LOOKUP_MISS_TIMEOUT
+            return row
+
+    def get(self, pk, version=None):
+        row = self.current(version)[1].get(pk)
+        return row if row is not None else self.reload_missing(1, pk)
+
+    def get_by_slug(self, slug):
+        row = self.current()[2].get(slug)
+        return row if row is not None else self.reload_missing(2, slug)
+
+    def invalidate(self):
+        """
+        Сбрасывает версию таблицы во всех процессах после фиксации
+        транзакции, чтобы никто не успел перечитать старые данные.
+        """
+        transaction.on_commit(lambda: bump_version(*self.dependency))
+
+
+def attach_lookups(objects, tables):
+    """
+    Подставляет в объекты связанные записи из таблиц поиска вместо
+    JOIN: tables — {имя внешнего ключа: LookupTable}. Версии всех
+    таблиц проверяются одним обращением к кешу.
+    """
+    versions = get_versions(*(table.dependency for table in tables.values()))
+    for (name, table), version in zip(tables.items(), versions):
+        field = objects[0]._meta.get_field(name)
+        for obj in objects:
+            pk = getattr(obj, field.attname)
+            if pk is None:
+                continue
+            row = table.get(pk, version)
+            if row is not None:
+                field.set_cached_value(obj, row)
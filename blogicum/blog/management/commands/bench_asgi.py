@@ -0,0 +1,184 @@
+import asyncio
+import importlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import AsyncClient, Client, override_settings
+from django.urls import clear_url_caches, reverse
+
+from blog.bench import percentile, test_database
+from blog.datagen import generate
+from blog.models import Category, Post
+
+User = get_user_model()
+
+
+def use_async_views(enabled):
+    """
+    Переключает маршруты блога между синхронными и асинхронными
+    представлениями (выбор делается при импорте blog.urls).
+    """
+    import blog.urls
+    import blogicum.urls
+
+    with override_settings(BLOG_ASYNC_VIEWS=enabled):
+        importlib.reload(blog.urls)
+    importlib.reload(blogicum.urls)
+    clear_url_caches()
+
+
+class Command(BaseCommand):
+    """
+    Сравнение пропускной способности страниц чтения под WSGI
+    (синхронные представления, поток на запрос) и под ASGI
+    (асинхронные представления в одном цикле событий).
+    """
+
+    help = (
+        "Замеряет запросы в секунду и задержки страниц чтения блога под WSGI "
+        "и ASGI при разном числе одновременных клиентов. Результат — JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            nargs="+",
+            default=[1, 4, 16, 64],
+            help="Числа одновременных клиентов.",
+        )
+        parser.add_argument(
+            "--duration", type=float, default=5, help="Длительность замера (с)."
+        )
+        parser.add_argument("--posts", type=int, default=2_000)
+        parser.add_argument("--comments", type=int, default=10_000)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--output", help="Файл для результата (по умолчанию — stdout)."
+        )
+
+    def handle(self, *args, **options):
+        directory = tempfile.mkdtemp(prefix="blogicum-bench-")
+        connection.close()
+        # Журнал медленных запросов отключён: под нагрузкой он сам тормозит замер.
+        settings = override_settings(REQUEST_STATS_SLOW_MS=float("inf"))
+        try:
+            with settings, test_database(
+                name=os.path.join(directory, "bench.sqlite3")
+            ):
+                generate(
+                    posts=options["posts"],
+                    comments=options["comments"],
+                    seed=options["seed"],
+                )
+                urls = self.get_urls()
+                results = {"wsgi": {}, "asgi": {}}
+                for concurrency in options["concurrency"]:
+                    self.stderr.write(f"wsgi × {concurrency}…")
+                    use_async_views(False)
+                    results["wsgi"][concurrency] = self.run_wsgi(
+                        urls, concurrency, options["duration"]
+                    )
+                    self.stderr.write(f"asgi × {concurrency}…")
+                    use_async_views(True)
+                    results["asgi"][concurrency] = asyncio.run(
+                        self.run_asgi(urls, concurrency, options["duration"])
+                    )
+        finally:
+            use_async_views(False)
+            shutil.rmtree(directory, ignore_errors=True)
+
+        report = {
+            "dataset": {key: options[key] for key in ("posts", "comments", "seed")},
+            "duration": options["duration"],
+            "results": results,
+        }
+        output = json.dumps(report, ensure_ascii=False, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as file:
+                file.write(output)
+        else:
+            self.stdout.write(output)
+
+    @staticmethod
+    def get_urls():
+        """
+        Страницы, по которым ходят клиенты: лента, категория, профиль
+        самого активного автора и самый комментируемый пост.
+        """
+        post = Post.objects.order_by("-comment_count").first()
+        return [
+            reverse("blog:index"),
+            reverse("blog:category_posts", args=[Category.objects.first().slug]),
+            reverse(
+                "blog:profile",
+                args=[User.objects.get(pk=post.author_id).username],
+            ),
+            reverse("blog:post_detail", args=[post.pk]),
+        ]
+
+    @staticmethod
+    def summary(timings, duration):
+        return {
+            "requests": len(timings),
+            "rps": round(len(timings) / duration, 1),
+            "p50_ms": round(percentile(timings, 50), 3) if timings else None,
+            "p99_ms": round(percentile(timings, 99), 3) if timings else None,
+        }
+
+    def run_wsgi(self, urls, concurrency, duration):
+        """
+        concurrency потоков, каждый со своим клиентом, как воркеры WSGI-сервера.
+        """
+        deadline = time.perf_counter() + duration
+        timings = []
+        lock = threading.Lock()
+
+        def worker(offset):
+            client = Client()
+            local = []
+            try:
+                while time.perf_counter() < deadline:
+                    started = time.perf_counter()
+                    client.get(urls[(offset + len(local)) % len(urls)])
+                    local.append((time.perf_counter() - started) * 1000)
+            finally:
+                connection.close()
+            with lock:
+                timings.extend(local)
+
+        threads = [
+            threading.Thread(target=worker, args=(offset,))
+            for offset in range(concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return self.summary(timings, duration)
+
+    async def run_asgi(self, urls, concurrency, duration):
+        """
+        concurrency сопрограмм-клиентов в одном цикле событий.
+        """
+        deadline = time.perf_counter() + duration
+        timings = []
+
+        async def worker(offset):
+            client = AsyncClient()
+            count = 0
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                await client.get(urls[(offset + count) % len(urls)])
+                timings.append((time.perf_counter() - started) * 1000)
+                count += 1
+
+        await asyncio.gather(*(worker(offset) for offset in range(concurrency)))
+        return self.summary(timings, duration)
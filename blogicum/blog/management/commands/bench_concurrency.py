@@ -0,0 +1,164 @@
+import json
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from blog.bench import percentile, test_database
+from blog.datagen import generate
+from blog.models import Comment, Post
+from core.db import SQLITE_PROFILES
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    """
+    Нагрузочный тест SQLite: пропускная способность чтения страниц
+    блога при одновременной записи комментариев.
+    """
+
+    help = (
+        "Запускает потоки-читатели (лента и страницы постов) и потоки-писатели "
+        "(новые комментарии) на файловой тестовой базе с выбранным профилем "
+        "PRAGMA и выводит пропускную способность, задержки и число ошибок "
+        "блокировки в JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--profile",
+            choices=sorted(SQLITE_PROFILES),
+            action="append",
+            help="Профиль PRAGMA (можно указать несколько; по умолчанию — все).",
+        )
+        parser.add_argument("--readers", type=int, default=4)
+        parser.add_argument("--writers", type=int, default=2)
+        parser.add_argument(
+            "--duration", type=float, default=10, help="Длительность замера (с)."
+        )
+        parser.add_argument("--posts", type=int, default=2_000)
+        parser.add_argument("--comments", type=int, default=10_000)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--output", help="Файл для результата (по умолчанию — stdout)."
+        )
+
+    def handle(self, *args, **options):
+        results = {}
+        for profile in options["profile"] or sorted(SQLITE_PROFILES):
+            self.stderr.write(f"{profile}…")
+            results[profile] = self.run_profile(profile, options)
+
+        report = {
+            "load": {
+                key: options[key]
+                for key in ("readers", "writers", "duration", "posts", "comments")
+            },
+            "results": results,
+        }
+        output = json.dumps(report, ensure_ascii=False, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as file:
+                file.write(output)
+        else:
+            self.stdout.write(output)
+
+    def run_profile(self, profile, options):
+        """
+        Создаёт файловую тестовую базу (потокам нужна общая база,
+        а не база в памяти), наполняет её и проводит замер.
+        """
+        directory = tempfile.mkdtemp(prefix="blogicum-bench-")
+        name = os.path.join(directory, "bench.sqlite3")
+        connection.close()  # PRAGMA применяются при создании соединения.
+        # Журнал медленных запросов отключён: под нагрузкой он сам тормозит замер.
+        settings = override_settings(
+            SQLITE_PROFILE=profile, REQUEST_STATS_SLOW_MS=float("inf")
+        )
+        try:
+            with settings, test_database(name=name):
+                generate(
+                    posts=options["posts"],
+                    comments=options["comments"],
+                    seed=options["seed"],
+                )
+                return self.run_load(options)
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)  # Вместе с файлами -wal и -shm.
+
+    def run_load(self, options):
+        """
+        Параллельно читает страницы и пишет комментарии в течение duration.
+        """
+        post_ids = list(
+            Post.objects.filter(is_visible=True).values_list("pk", flat=True)
+        )
+        author = User.objects.first()
+        urls = [reverse("blog:index")] + [
+            reverse("blog:post_detail", args=[pk]) for pk in post_ids[:100]
+        ]
+        deadline = time.perf_counter() + options["duration"]
+        lock = threading.Lock()
+        reads, writes = [], []
+        errors = {"read": 0, "write": 0}
+
+        def worker(action, timings, kind):
+            client = Client()
+            rng = random.Random(threading.get_ident())
+            local = []
+            try:
+                while time.perf_counter() < deadline:
+                    started = time.perf_counter()
+                    try:
+                        action(client, rng)
+                    except OperationalError:  # database is locked
+                        with lock:
+                            errors[kind] += 1
+                        continue
+                    local.append((time.perf_counter() - started) * 1000)
+            finally:
+                connection.close()  # Соединения потоков не закрываются сами.
+            with lock:
+                timings.extend(local)
+
+        def read(client, rng):
+            client.get(rng.choice(urls))
+
+        def write(client, rng):
+            Comment.objects.create(
+                post_id=rng.choice(post_ids), author=author, text="Комментарий"
+            )
+
+        threads = [
+            threading.Thread(target=worker, args=(read, reads, "read"))
+            for _ in range(options["readers"])
+        ] + [
+            threading.Thread(target=worker, args=(write, writes, "write"))
+            for _ in range(options["writers"])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        duration = options["duration"]
+        return {
+            "reads": len(reads),
+            "reads_per_s": round(len(reads) / duration, 1),
+            "read_p50_ms": round(percentile(reads, 50), 3) if reads else None,
+            "read_p99_ms": round(percentile(reads, 99), 3) if reads else None,
+            "writes": len(writes),
+            "writes_per_s": round(len(writes) / duration, 1),
+            "write_p99_ms": round(percentile(writes, 99), 3) if writes else None,
+            "read_errors": errors["read"],
+            "write_errors": errors["write"],
+        }
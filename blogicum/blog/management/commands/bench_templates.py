@@ -0,0 +1,125 @@
+import copy
+import json
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from blog.bench import compare, measure, test_database
+from blog.datagen import generate
+from blog.models import Category, Post
+from core.templates import warm_templates
+
+User = get_user_model()
+
+
+def template_settings(cached):
+    """
+    Копия TEMPLATES с загрузчиками settings.TEMPLATE_LOADERS,
+    обёрнутыми (cached=True) или нет в cached.Loader.
+    """
+    templates = copy.deepcopy(settings.TEMPLATES)
+    loaders = list(settings.TEMPLATE_LOADERS)
+    for backend in templates:
+        backend["OPTIONS"]["loaders"] = (
+            [("django.template.loaders.cached.Loader", loaders)] if cached else loaders
+        )
+    return templates
+
+
+class Command(BaseCommand):
+    """
+    Команда для замера времени рендера страниц блога с чтением шаблонов
+    с диска на каждом запросе и с кешем скомпилированных шаблонов,
+    прогретым при старте (TEMPLATE_CACHE).
+    """
+
+    help = (
+        "Замеряет холодный запрос и p50/p99 страниц блога без кеша шаблонов "
+        "и с прогретым cached.Loader. Результат и разница выводятся в JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--posts", type=int, default=2_000)
+        parser.add_argument("--comments", type=int, default=10_000)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=50,
+            help="Количество тёплых запусков каждой страницы.",
+        )
+        parser.add_argument(
+            "--output", help="Файл для результата (по умолчанию — stdout)."
+        )
+
+    def handle(self, *args, **options):
+        with test_database():
+            generate(
+                posts=options["posts"],
+                comments=options["comments"],
+                seed=options["seed"],
+            )
+            routes = self.get_routes()
+            results = {}
+            for mode, cached in (("filesystem", False), ("cached", True)):
+                self.stderr.write(f"{mode}…")
+                with override_settings(TEMPLATES=template_settings(cached)):
+                    results[mode] = self.run_benchmarks(
+                        routes, cached, options["repeat"]
+                    )
+
+        report = {
+            "dataset": {key: options[key] for key in ("posts", "comments", "seed")},
+            "results": results,
+            "changes": compare(results["filesystem"], results["cached"]),
+        }
+        output = json.dumps(report, ensure_ascii=False, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as file:
+                file.write(output)
+        else:
+            self.stdout.write(output)
+
+    @staticmethod
+    def get_routes():
+        """
+        Страницы для замера: (клиент, адрес). Страница поста открывается
+        и анонимом, и пользователем — последнему выводится форма комментария.
+        """
+        reader = User.objects.create_user("bench_reader", password="bench")
+        anonymous = Client()
+        client = Client()
+        client.force_login(reader)
+        post = Post.objects.order_by("-comment_count").first()
+        author = User.objects.get(pk=post.author_id)
+        detail = reverse("blog:post_detail", args=[post.pk])
+        return {
+            "index": (anonymous, reverse("blog:index")),
+            "category_posts": (
+                anonymous,
+                reverse("blog:category_posts", args=[Category.objects.first().slug]),
+            ),
+            "profile_view": (anonymous, reverse("blog:profile", args=[author.username])),
+            "post_detail": (anonymous, detail),
+            "post_detail_auth": (client, detail),
+            "about": (anonymous, reverse("pages:about")),
+            "login": (anonymous, reverse("login")),
+        }
+
+    def run_benchmarks(self, routes, cached, repeat):
+        """
+        Замеряет страницы с пустым кешем фрагментов, чтобы оба режима
+        начинали в одинаковых условиях; кеш шаблонов прогревается заранее,
+        как при старте процесса.
+        """
+        cache.clear()
+        if cached:
+            warm_templates()
+        results = {}
+        for name, (client, url) in routes.items():
+            results[name] = measure(lambda: client.get(url), repeat=repeat)
+        return results
@@ -0,0 +1,165 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.test import Client
+from django.urls import reverse
+
+from blog.bench import compare, measure, test_database
+from blog.datagen import generate
+from blog.models import Category, Comment, Post
+from blog.utils import CURSOR_NEXT, encode_cursor
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    """
+    Команда для замера количества запросов, задержки и пика памяти
+    для каждого маршрута блога на синтетических данных.
+    """
+
+    help = (
+        "Замеряет количество SQL-запросов, p50/p99 задержки и пик памяти "
+        "для маршрутов блога и админки. Результат выводится в JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=200)
+        parser.add_argument("--posts", type=int, default=10_000)
+        parser.add_argument("--comments", type=int, default=50_000)
+        parser.add_argument(
+            "--skew",
+            type=float,
+            default=1.1,
+            help="Показатель распределения Ципфа для постов и комментариев.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=20,
+            help="Количество тёплых запусков каждого маршрута.",
+        )
+        parser.add_argument(
+            "--output", help="Файл для результата (по умолчанию — stdout)."
+        )
+        parser.add_argument(
+            "--compare", help="JSON предыдущего прогона для сравнения."
+        )
+
+    def handle(self, *args, **options):
+        with test_database():
+            generate(
+                users=options["users"],
+                posts=options["posts"],
+                comments=options["comments"],
+                skew=options["skew"],
+                seed=options["seed"],
+            )
+            results = self.run_benchmarks(options["repeat"])
+
+        report = {
+            "dataset": {
+                key: options[key]
+                for key in ("users", "posts", "comments", "skew", "seed")
+            },
+            "results": results,
+        }
+        if options["compare"]:
+            with open(options["compare"], encoding="utf-8") as previous:
+                report["changes"] = compare(
+                    json.load(previous)["results"], results
+                )
+        output = json.dumps(report, ensure_ascii=False, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as file:
+                file.write(output)
+        else:
+            self.stdout.write(output)
+
+    def run_benchmarks(self, repeat):
+        """
+        Прогоняет замеры по всем маршрутам и возвращает словарь результатов.
+        """
+        reader = User.objects.create_user("bench_reader", password="bench")
+        admin = User.objects.create_superuser("bench_admin", password="bench")
+        anonymous = Client()
+        client = Client()
+        client.force_login(reader)
+        staff = Client()
+        staff.force_login(admin)
+
+        post = Post.objects.order_by("-comment_count").first()
+        old_post = Post.objects.order_by("pub_date", "id")[10]
+        category = Category.objects.first()
+        author = User.objects.get(pk=post.author_id)
+        detail = reverse("blog:post_detail", args=[post.pk])
+        own_comment = Comment.objects.create(post=post, author=reader, text="—")
+
+        def get(http, url):
+            return lambda: http.get(url)
+
+        def post_to(http, url, data=None):
+            return lambda: http.post(url, data or {})
+
+        state = {}
+
+        def new_comment():
+            state["comment"] = Comment.objects.create(
+                post=post, author=reader, text="—"
+            )
+
+        def delete_comment():
+            return client.post(
+                reverse(
+                    "blog:delete_comment", args=[post.pk, state["comment"].pk]
+                )
+            )
+
+        routes = {
+            "index": get(anonymous, reverse("blog:index")),
+            "index_deep": get(
+                anonymous,
+                reverse("blog:index")
+                + "?cursor=" + encode_cursor(CURSOR_NEXT, old_post),
+            ),
+            "category_posts": get(
+                anonymous, reverse("blog:category_posts", args=[category.slug])
+            ),
+            "profile_view": get(
+                anonymous, reverse("blog:profile", args=[author.username])
+            ),
+            "post_detail": get(anonymous, detail),
+            "post_detail_auth": get(client, detail),
+            "add_comment": post_to(
+                client, reverse("blog:add_comment", args=[post.pk]),
+                {"text": "Комментарий"},
+            ),
+            "edit_comment": post_to(
+                client,
+                reverse("blog:edit_comment", args=[post.pk, own_comment.pk]),
+                {"text": "Изменённый комментарий"},
+            ),
+            "admin_post_changelist": get(
+                staff, reverse("admin:blog_post_changelist")
+            ),
+            "admin_comment_changelist": get(
+                staff, reverse("admin:blog_comment_changelist")
+            ),
+            "admin_category_changelist": get(
+                staff, reverse("admin:blog_category_changelist")
+            ),
+            "admin_location_changelist": get(
+                staff, reverse("admin:blog_location_changelist")
+            ),
+        }
+        results = {}
+        for name, request in routes.items():
+            self.stderr.write(f"{name}…")
+            results[name] = measure(request, repeat=repeat)
+        self.stderr.write("delete_comment…")
+        results["delete_comment"] = measure(
+            delete_comment, repeat=repeat, prepare=new_comment
+        )
+        return results
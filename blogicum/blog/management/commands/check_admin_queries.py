@@ -0,0 +1,108 @@
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, reset_queries
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.bench import test_database
+from blog.datagen import generate
+from blog.models import Category, Comment, Location, Post
+
+User = get_user_model()
+
+# Допустимое число запросов на открытие списка админки: сессия,
+# пользователь, статистика и COUNT(*), страница, варианты фильтров
+# и для date_hierarchy — MIN/MAX и периоды одним запросом.
+CHANGELIST_BUDGET = {
+    Post: 10,
+    Comment: 8,
+    Category: 6,
+    Location: 6,
+}
+
+
+class Command(BaseCommand):
+    """
+    Проверка числа SQL-запросов списков админки на синтетических данных.
+    Каждый список открывается с 10 и со 100 строками на странице:
+    число запросов не должно зависеть от числа строк и превышать бюджет.
+    """
+
+    help = (
+        "Проверяет, что списки админки выполняют постоянное число "
+        "SQL-запросов. Завершается ошибкой при нарушении."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--posts", type=int, default=2_000)
+        parser.add_argument("--comments", type=int, default=5_000)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        failures = []
+        # Журнал медленных запросов не нужен: проверяется только число запросов.
+        settings = override_settings(REQUEST_STATS_SLOW_MS=float("inf"))
+        with settings, test_database():
+            generate(
+                posts=options["posts"],
+                comments=options["comments"],
+                seed=options["seed"],
+            )
+            staff = Client()
+            staff.force_login(
+                User.objects.create_superuser("admin_check", password="check")
+            )
+            for model, budget in CHANGELIST_BUDGET.items():
+                failures += self.check_changelist(staff, model, budget)
+        if failures:
+            raise CommandError("; ".join(failures))
+        self.stdout.write(self.style.SUCCESS("Списки админки в пределах бюджета."))
+
+    def check_changelist(self, client, model, budget):
+        """
+        Открывает список модели (и, если есть date_hierarchy, год, месяц
+        и день последней записи) с 10 и 100 строками на странице.
+        Бюджет проверяется для каждого адреса и размера страницы.
+        Возвращает список нарушений.
+        """
+        model_admin = admin.site._registry[model]
+        name = model._meta.model_name
+        url = reverse(f"admin:{model._meta.app_label}_{name}_changelist")
+        urls = [url]
+        field = model_admin.date_hierarchy
+        if field:
+            moment = timezone.localtime(getattr(model.objects.latest(field), field))
+            year = f"{url}?{field}__year={moment.year}"
+            month = f"{year}&{field}__month={moment.month}"
+            urls += [year, month, f"{month}&{field}__day={moment.day}"]
+        self.count_queries(client, url)  # Прогрев таблиц поиска в памяти.
+        counts = {}
+        try:
+            for per_page in (10, 100):
+                model_admin.list_per_page = per_page
+                counts[per_page] = [self.count_queries(client, item) for item in urls]
+        finally:
+            model_admin.list_per_page = 100
+        self.stdout.write(f"{name}: {counts[10]} / {counts[100]} (бюджет {budget})")
+        failures = []
+        if counts[10] != counts[100]:
+            failures.append(f"{name}: запросы растут с числом строк")
+        for per_page, numbers in counts.items():
+            for item, number in zip(urls, numbers):
+                if number > budget:
+                    failures.append(
+                        f"{item} ({per_page} строк): {number} запросов > {budget}"
+                    )
+        return failures
+
+    @staticmethod
+    def count_queries(client, url):
+        reset_queries()
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url)
+        if response.status_code != 200:
+            raise CommandError(f"{url}: ответ {response.status_code}")
+        return len(queries)
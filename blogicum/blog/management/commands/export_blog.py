@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from blog.transfer import FORMATS, export_blog
+
+
+class Command(BaseCommand):
+    """
+    Команда для выгрузки контента блога в JSON Lines или CSV.
+    """
+
+    help = (
+        "Выгружает категории, местоположения, посты и комментарии в каталог: "
+        "по файлу на модель. Строки читаются частями, память не растёт "
+        "с размером базы."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("directory", help="Каталог для файлов выгрузки.")
+        parser.add_argument("--format", choices=FORMATS, default="jsonl")
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Сколько строк читать из базы за раз.",
+        )
+
+    def handle(self, *args, **options):
+        counts = export_blog(
+            options["directory"], options["format"], options["chunk_size"]
+        )
+        for name, count in counts.items():
+            self.stdout.write(f"{name}: {count}")
+        self.stdout.write(self.style.SUCCESS("Выгрузка завершена"))
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from blog.cache import bump_version
+from blog.images import generate_derivatives
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    """
+    Команда для создания недостающих уменьшенных копий изображений постов.
+    """
+
+    help = (
+        "Создаёт недостающие WebP/JPEG копии изображений постов "
+        "и заполняет их размеры."
+    )
+
+    def handle(self, *args, **options):
+        posts = (
+            Post.objects.exclude(image="")
+            .exclude(image=None)
+            .only("id", "image", "image_width", "image_height")
+            .iterator()
+        )
+        processed = failed = 0
+        for post in posts:
+            try:
+                width, height = generate_derivatives(post.image.name)
+            except (OSError, ValueError) as error:
+                failed += 1
+                self.stderr.write(f"{post.image.name}: {error}")
+                continue
+            if (width, height) != (post.image_width, post.image_height):
+                Post.objects.filter(pk=post.pk).update(
+                    image_width=width, image_height=height
+                )
+            bump_version("post", post.pk)
+            processed += 1
+        self.stdout.write(
+            self.style.SUCCESS(f"Обработано: {processed}, с ошибками: {failed}")
+        )
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.transfer import FORMATS, import_blog
+
+
+class Command(BaseCommand):
+    """
+    Команда для загрузки выгрузки export_blog.
+    """
+
+    help = (
+        "Загружает категории, местоположения, посты и комментарии из каталога "
+        "выгрузки пакетными bulk_create в одной транзакции и пересчитывает "
+        "счётчики комментариев."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("directory", help="Каталог с файлами выгрузки.")
+        parser.add_argument("--format", choices=FORMATS, default="jsonl")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=2000,
+            help="Сколько строк вставлять за один bulk_create.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            counts = import_blog(
+                options["directory"], options["format"], options["batch_size"]
+            )
+        except (KeyError, ValueError) as error:
+            raise CommandError(f"Некорректная строка выгрузки: {error!r}")
+        for name, count in counts.items():
+            self.stdout.write(f"{name}: {count}")
+        self.stdout.write(self.style.SUCCESS("Загрузка завершена"))
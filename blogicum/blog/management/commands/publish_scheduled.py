@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.services import publish_due_posts
+
+
+class Command(BaseCommand):
+    """
+    Команда для публикации отложенных постов, дата которых наступила.
+    """
+
+    help = (
+        "Делает видимыми в лентах посты, дата публикации которых наступила. "
+        "С --loop работает как планировщик, проверяя посты каждые --interval секунд."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Сколько постов публиковать за один UPDATE.",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Не завершаться, а проверять посты периодически.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=30,
+            help="Пауза между проверками в режиме --loop (секунды).",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            published = publish_due_posts(batch_size=options["batch_size"])
+            if published or not options["loop"]:
+                self.stdout.write(
+                    self.style.SUCCESS(f"Опубликовано постов: {published}")
+                )
+            if not options["loop"]:
+                return
+            try:
+                time.sleep(options["interval"])
+            except KeyboardInterrupt:
+                return
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+from blog.search import get_search_backend
+
+
+class Command(BaseCommand):
+    """
+    Команда для полной переиндексации постов в поисковом бэкенде.
+    Индекс заменяется в одной транзакции (BaseSearchBackend.rebuild),
+    так что поиск не остаётся пустым на время переиндексации.
+    """
+
+    help = "Перестраивает поисковый индекс постов, читая посты частями."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=2000,
+            help="Сколько постов читать и индексировать за раз.",
+        )
+
+    def handle(self, *args, **options):
+        indexed = get_search_backend().rebuild(self.chunks(options["chunk_size"]))
+        self.stdout.write(self.style.SUCCESS(f"Проиндексировано постов: {indexed}"))
+
+    @staticmethod
+    def chunks(chunk_size):
+        """
+        Опубликованные посты списками по chunk_size.
+        """
+        posts = (
+            Post.objects.filter(is_published=True)
+            .only("id", "title", "text")
+            .order_by()
+            .iterator(chunk_size=chunk_size)
+        )
+        chunk = []
+        for post in posts:
+            chunk.append(post)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from blog.services import recount_comments
+
+
+class Command(BaseCommand):
+    """
+    Команда для сверки счётчиков комментариев Post.comment_count.
+    """
+
+    help = "Пересчитывает разошедшиеся счётчики комментариев постов."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Размер пакета для чтения и обновления постов.",
+        )
+
+    def handle(self, *args, **options):
+        fixed = recount_comments(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Исправлено счётчиков: {fixed}"))
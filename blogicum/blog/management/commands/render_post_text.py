@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from blog.services import render_post_texts
+
+
+class Command(BaseCommand):
+    """
+    Команда для заполнения Post.excerpt и Post.text_html.
+    """
+
+    help = (
+        "Пересчитывает анонсы и HTML текста постов (после изменения "
+        "EXCERPT_WORDS или загрузки постов в обход Post.save())."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Размер пакета для чтения и обновления постов.",
+        )
+
+    def handle(self, *args, **options):
+        total = render_post_texts(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Обработано постов: {total}"))
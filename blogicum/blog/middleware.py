@@ -0,0 +1,132 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.urls import Resolver404, resolve
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+from core.middleware import async_mode
+
+from .cache import get_versions, record
+
+PAGE_KEY = "blog:page:{digest}"  # Ключ страницы в кеше: хеш пути с параметрами.
+
+
+class AnonymousPageCacheMiddleware:
+    """
+    Кеш целых страниц пространства имён blog для анонимных GET-запросов.
+    Запрос без куки сессии и сообщений отдаётся из кеша до сессий,
+    аутентификации и ORM.
+
+    Вместе с ответом хранятся зависимости страницы — пары (вид, pk),
+    зарегистрированные представлением (см. blog.cache.add_page_dependencies),
+    и их версии на момент сохранения. Сигналы Post, Comment, Category
+    и Location сбрасывают версии только затронутых объектов и лент,
+    поэтому устаревают лишь зависящие от них страницы; кеш целиком
+    не очищается. Старые копии вытесняются бэкендом (LRU для locmem).
+
+    Включается настройкой BLOG_PAGE_CACHE. Под ASGI работает без
+    переключения потоков: обращения к локальному кешу не блокируют цикл.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "BLOG_PAGE_CACHE", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.is_async = async_mode(self, get_response)
+        self.cache = caches[getattr(settings, "BLOG_PAGE_CACHE_ALIAS", "pages")]
+        self.timeout = getattr(settings, "BLOG_PAGE_CACHE_TIMEOUT", 600)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not self.is_cacheable_request(request):
+            return self.get_response(request)
+        key, response = self.lookup(request)
+        if response is not None:
+            return response
+        started = time.time_ns()
+        response = self.get_response(request)
+        self.store(request, key, response, started)
+        return response
+
+    async def __acall__(self, request):
+        if not self.is_cacheable_request(request):
+            return await self.get_response(request)
+        key, response = self.lookup(request)
+        if response is not None:
+            return response
+        started = time.time_ns()
+        response = await self.get_response(request)
+        self.store(request, key, response, started)
+        return response
+
+    def lookup(self, request):
+        """
+        Возвращает ключ страницы и актуальный ответ из кеша (или None).
+        """
+        key = PAGE_KEY.format(
+            digest=hashlib.md5(request.get_full_path().encode()).hexdigest()
+        )
+        entry = self.cache.get(key)
+        if entry is not None:
+            response, dependencies, versions = entry
+            if get_versions(*dependencies) == versions:
+                record("page", True)
+                return key, get_conditional_response(
+                    request,
+                    etag=response.get("ETag"),
+                    last_modified=parse_http_date_safe(response.get("Last-Modified")),
+                    response=response,
+                )
+        record("page", False)
+        return key, None
+
+    def store(self, request, key, response, started):
+        """
+        Сохраняет ответ вместе с версиями зависимостей страницы.
+        """
+        dependencies = getattr(request, "page_dependencies", None)
+        if dependencies and self.is_cacheable_response(response):
+            versions = get_versions(*dependencies)
+            # Версия, сброшенная во время рендеринга, новее начала запроса:
+            # такая страница могла устареть ещё до сохранения.
+            if max(versions) < started:
+                self.cache.set(key, (response, dependencies, versions), self.timeout)
+
+    @staticmethod
+    def is_cacheable_request(request):
+        """
+        Анонимный GET-запрос к странице пространства имён blog.
+        """
+        if request.method != "GET":
+            return False
+        if (
+            settings.SESSION_COOKIE_NAME in request.COOKIES
+            or CookieStorage.cookie_name in request.COOKIES
+        ):
+            return False
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return False
+        return match.namespace == "blog"
+
+    @staticmethod
+    def is_cacheable_response(response):
+        """
+        Успешный ответ без куки и без запрета публичного кеширования.
+        """
+        return (
+            response.status_code == 200
+            and not response.streaming
+            and not response.cookies
+            and "private" not in response.get("Cache-Control", "")
+        )
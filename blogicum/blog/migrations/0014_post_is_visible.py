@@ -0,0 +1,52 @@
+from django.db import migrations, models
+from django.utils.timezone import now
+
+
+def fill_visibility(apps, schema_editor):
+    """
+    Вычисляет is_visible для существующих постов одним UPDATE.
+    """
+    Post = apps.get_model("blog", "Post")
+    Post.objects.update(is_visible=False)
+    Post.objects.filter(
+        is_published=True,
+        pub_date__lte=now(),
+        category__is_published=True,
+    ).update(is_visible=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_post_image_dimensions'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_published_date_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_category_date_idx',
+        ),
+        migrations.RenameField(
+            model_name='post',
+            old_name='is_scheduled',
+            new_name='is_visible',
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='is_visible',
+            field=models.BooleanField(default=False, editable=False, help_text='Пост опубликован, дата публикации наступила и категория опубликована. Поддерживается при записи.', verbose_name='Виден в ленте'),
+        ),
+        migrations.RunPython(fill_visibility, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_visible', True)), fields=['-pub_date', '-id'], name='post_visible_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_visible', True)), fields=['category', '-pub_date', '-id'], name='post_visible_category_idx'),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 3.2.16 on 2026-10-18 20:17
+
+from django.db import migrations, models
+from django.template.defaultfilters import linebreaksbr
+from django.utils.text import Truncator
+
+# Копии blog.models.make_excerpt и render_text_html на момент миграции:
+# их последующие изменения не должны менять результат этой миграции.
+EXCERPT_WORDS = 60
+
+
+def make_excerpt(text):
+    return Truncator(text).words(EXCERPT_WORDS)
+
+
+def render_text_html(text):
+    return str(linebreaksbr(text, autoescape=True))
+
+
+def fill_rendered_text(apps, schema_editor):
+    """
+    Заполняет анонс и HTML текста существующих постов пакетами.
+    """
+    Post = apps.get_model("blog", "Post")
+    last_pk = 0
+    while True:
+        rows = list(
+            Post.objects.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .values_list("pk", "text")[:500]
+        )
+        if not rows:
+            return
+        Post.objects.bulk_update(
+            [
+                Post(pk=pk, excerpt=make_excerpt(text), text_html=render_text_html(text))
+                for pk, text in rows
+            ],
+            ["excerpt", "text_html"],
+        )
+        last_pk = rows[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0017_admin_date_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.TextField(blank=True, editable=False, help_text='Начало текста для карточек и лент. Обновляется при записи.', verbose_name='Анонс'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='text_html',
+            field=models.TextField(blank=True, editable=False, help_text='Экранированный текст для страницы поста. Обновляется при записи.', verbose_name='Текст в HTML'),
+        ),
+        migrations.RunPython(fill_rendered_text, migrations.RunPython.noop),
+    ]
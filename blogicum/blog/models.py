@@ -1,11 +1,14 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.template.defaultfilters import linebreaksbr
 from django.urls import reverse
 from django.utils.text import Truncator
 from django.utils.timezone import now
 
 from core.models import PublishedModel
-from .constants import HELP_CATEGORY, HELP_POST, MAX_LEN
+from .constants import EXCERPT_WORDS, HELP_CATEGORY, HELP_POST, MAX_LEN
+from .images import strip_metadata
+from .lookups import LookupTable, attach_lookups
 
 User = get_user_model()
 
@@ -44,12 +47,77 @@ class Location(PublishedModel):
         return Truncator(self.name).words(MAX_LEN)
 
 
+# Категории и местоположения в памяти процесса (см. blog.lookups).
+# Записи общие для всех запросов, поэтому изменять их нельзя.
+category_table = LookupTable(Category, "category", slug_field="slug")
+location_table = LookupTable(Location, "location")
+
+
+def make_excerpt(text):
+    """
+    Анонс поста: первые EXCERPT_WORDS слов текста.
+    """
+    return Truncator(text).words(EXCERPT_WORDS)
+
+
+def render_text_html(text):
+    """
+    Текст поста в HTML: экранированный, с <br> вместо переводов строк.
+    """
+    return str(linebreaksbr(text, autoescape=True))
+
+
+class PostQuerySet(models.QuerySet):
+    """
+    QuerySet постов с подстановкой категорий и местоположений
+    из таблиц поиска вместо JOIN (with_lookups).
+    """
+
+    _with_lookups = False
+
+    def with_lookups(self):
+        clone = self._chain()
+        clone._with_lookups = True
+        return clone
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._with_lookups = self._with_lookups
+        return clone
+
+    def _fetch_all(self):
+        fetched = self._result_cache is None
+        super()._fetch_all()
+        if (
+            fetched
+            and self._with_lookups
+            and self._result_cache
+            and isinstance(self._result_cache[0], Post)
+        ):
+            attach_lookups(
+                self._result_cache,
+                {"category": category_table, "location": location_table},
+            )
+
+
 class Post(PublishedModel):
     """
     Модель для публикаций в блоге.
     """
     title = models.CharField(max_length=256, verbose_name="Заголовок")
     text = models.TextField(verbose_name="Текст")
+    excerpt = models.TextField(
+        blank=True,
+        editable=False,
+        verbose_name="Анонс",
+        help_text="Начало текста для карточек и лент. Обновляется при записи.",
+    )
+    text_html = models.TextField(
+        blank=True,
+        editable=False,
+        verbose_name="Текст в HTML",
+        help_text="Экранированный текст для страницы поста. Обновляется при записи.",
+    )
     pub_date = models.DateTimeField(
         help_text=f"Если установить дату и время в будущем — {HELP_POST}",
         verbose_name="Дата и время публикации",
@@ -73,32 +141,69 @@ class Post(PublishedModel):
         verbose_name="Категория",
     )
     image = models.ImageField("Фото", blank=True, null=True)
+    image_width = models.PositiveIntegerField(
+        null=True, blank=True, editable=False, verbose_name="Ширина фото"
+    )
+    image_height = models.PositiveIntegerField(
+        null=True, blank=True, editable=False, verbose_name="Высота фото"
+    )
     comment_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Изменено")
     is_published = models.BooleanField(
         default=True,
         verbose_name="Разрешение на публикацию",
     )
-    is_scheduled = models.BooleanField(
+    is_visible = models.BooleanField(
         default=False,
-        verbose_name="Запланирован",
+        editable=False,
+        verbose_name="Виден в ленте",
+        help_text=(
+            "Пост опубликован, дата публикации наступила и категория "
+            "опубликована. Поддерживается при записи."
+        ),
     )
 
+    objects = PostQuerySet.as_manager()
+
     def save(self, *args, **kwargs):
         """
-        Переопределяет сохранение для обновления поля is_scheduled.
+        Переопределяет сохранение для обновления поля is_visible,
+        анонса и HTML текста и размеров изображения.
         """
-        if self.is_published and self.pub_date <= now():
-            self.is_scheduled = True
-        else:
-            self.is_scheduled = False
+        self.is_visible = self.compute_visibility()
+        if "text" not in self.get_deferred_fields():
+            self.render_text()
+        if self.image and not self.image._committed:
+            # Новый файл сохраняется без метаданных (EXIF, координаты съёмки):
+            # оригинал отдаётся, пока нет уменьшенных копий.
+            stripped = strip_metadata(self.image)
+            if stripped is not None:
+                content, self.image_width, self.image_height = stripped
+                self.image.save(self.image.name, content, save=False)
+            else:
+                self.image_width, self.image_height = self.image.width, self.image.height
+        elif not self.image:
+            self.image_width = self.image_height = None
         super().save(*args, **kwargs)
 
-    def update_comment_count(self):
+    def render_text(self):
+        """
+        Пересчитывает анонс и HTML текста, чтобы шаблоны не обрабатывали
+        полный текст при каждом показе.
+        """
+        self.excerpt = make_excerpt(self.text)
+        self.text_html = render_text_html(self.text)
+
+    def compute_visibility(self, moment=None):
         """
-        Обновляет количество комментариев для поста.
+        Проверяет, должен ли пост быть виден в публичных лентах.
         """
-        self.comment_count = self.comments.count()
-        self.save(update_fields=["comment_count"])
+        return (
+            self.is_published
+            and self.pub_date <= (moment or now())
+            and self.category_id is not None
+            and self.category.is_published
+        )
 
     def get_absolute_url(self):
         """
@@ -111,6 +216,36 @@ class Post(PublishedModel):
         verbose_name_plural = "Публикации"
         default_related_name = "posts"
         ordering = ["-pub_date"]
+        indexes = [
+            # Django выводит фильтр is_visible=True как голый столбец
+            # ("blog_post"."is_visible"), поэтому SQLite не может искать по
+            # нему в составном индексе. Частичные индексы с тем же условием
+            # подходят под такой WHERE и отдают строки уже в порядке
+            # (pub_date, id), как в курсорной пагинации.
+            models.Index(
+                fields=["-pub_date", "-id"],
+                condition=models.Q(is_visible=True),
+                name="post_visible_date_idx",
+            ),
+            models.Index(
+                fields=["category", "-pub_date", "-id"],
+                condition=models.Q(is_visible=True),
+                name="post_visible_category_idx",
+            ),
+            # Планировщик: отложенные посты, ожидающие даты публикации.
+            models.Index(
+                fields=["pub_date", "id"],
+                condition=models.Q(is_visible=False, is_published=True),
+                name="post_due_idx",
+            ),
+            # Профиль автора: author_id = ? (для владельца — без фильтра публикации).
+            models.Index(
+                fields=["author", "-pub_date", "-id"],
+                name="post_author_date_idx",
+            ),
+            # Админка: сортировка всех постов и фильтры date_hierarchy.
+            models.Index(fields=["-pub_date", "-id"], name="post_date_idx"),
+        ]
 
     def __str__(self):
         return Truncator(self.title).words(MAX_LEN)
@@ -140,3 +275,7 @@ class Comment(models.Model):
         verbose_name = "Комментарий"
         verbose_name_plural = "Комментарии"
         ordering = ("created_at",)
+        indexes = [
+            # Админка: сортировка и фильтры date_hierarchy по дате.
+            models.Index(fields=["created_at", "id"], name="comment_created_idx"),
+        ]
@@ -0,0 +1,72 @@
+import logging
+from threading import Event, Lock, Thread
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from .services import publish_due_posts
+
+logger = logging.getLogger(__name__)
+
+# Ленты показывают только посты с is_visible=True, а отложенный пост
+# становится видимым, только когда publish_due_posts обработает его.
+# Планировщик делает это в фоновом потоке процесса сервера
+# (запускается из blogicum/wsgi.py и asgi.py); вместо него можно
+# запускать отдельный процесс publish_scheduled --loop.
+
+_scheduler = None
+_lock = Lock()
+
+
+class Scheduler:
+    """
+    Фоновый поток, публикующий посты с наступившей датой каждые
+    interval секунд. Ошибка одной проверки пишется в лог
+    и не останавливает поток.
+    """
+
+    def __init__(self, interval, batch_size=500):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.stopped = Event()
+        self.thread = Thread(target=self.run, name="blog-scheduler", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self.stopped.set()
+        self.thread.join(timeout)
+
+    def tick(self):
+        """
+        Одна проверка. Возвращает число опубликованных постов.
+        """
+        try:
+            return publish_due_posts(batch_size=self.batch_size)
+        except Exception:
+            logger.exception("Не удалось опубликовать отложенные посты")
+            return 0
+        finally:
+            close_old_connections()
+
+    def run(self):
+        while not self.stopped.is_set():
+            self.tick()
+            self.stopped.wait(self.interval)
+
+
+def start_scheduler():
+    """
+    Запускает планировщик процесса с интервалом BLOG_PUBLISH_INTERVAL
+    (0 — не запускать). Повторный вызов возвращает уже запущенный.
+    """
+    global _scheduler
+    interval = getattr(settings, "BLOG_PUBLISH_INTERVAL", 0)
+    if not interval:
+        return None
+    with _lock:
+        if _scheduler is None:
+            _scheduler = Scheduler(interval).start()
+    return _scheduler
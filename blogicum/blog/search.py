@@ -0,0 +1,193 @@
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils.html import escape
+from django.utils.module_loading import import_string
+
+from .models import Post
+
+HIGHLIGHT_START = "\x02"  # Служебные маркеры подсветки: заменяются на <mark>
+HIGHLIGHT_END = "\x03"  # после экранирования текста фрагмента.
+
+
+def highlight(fragment):
+    """
+    Экранирует фрагмент текста и превращает маркеры подсветки в <mark>.
+    """
+    return (
+        escape(fragment)
+        .replace(HIGHLIGHT_START, "<mark>")
+        .replace(HIGHLIGHT_END, "</mark>")
+    )
+
+
+class BaseSearchBackend:
+    """
+    Интерфейс поискового бэкенда для постов.
+    Бэкенд хранит индекс и ранжирует совпадения; правила видимости
+    постов применяются в представлении поверх результатов поиска.
+    """
+
+    def index_posts(self, posts):
+        """
+        Добавляет посты в индекс или обновляет их.
+        """
+        raise NotImplementedError
+
+    def remove_posts(self, post_ids):
+        """
+        Удаляет посты из индекса.
+        """
+        raise NotImplementedError
+
+    def clear(self):
+        """
+        Полностью очищает индекс.
+        """
+        raise NotImplementedError
+
+    def rebuild(self, chunks):
+        """
+        Заменяет индекс постами из chunks (итератор списков постов).
+        Очистка и переиндексация идут в одной транзакции: до её фиксации
+        поиск работает по старому индексу, а при ошибке он сохраняется.
+        Возвращает число проиндексированных постов.
+        """
+        indexed = 0
+        with transaction.atomic():
+            self.clear()
+            for chunk in chunks:
+                self.index_posts(chunk)
+                indexed += len(chunk)
+        return indexed
+
+    def search(self, query, limit):
+        """
+        Возвращает id постов, подходящих под запрос, от лучших к худшим.
+        """
+        raise NotImplementedError
+
+    def snippets(self, query, post_ids):
+        """
+        Возвращает {id поста: HTML-фрагмент текста с подсветкой}.
+        """
+        raise NotImplementedError
+
+
+class SQLiteFTSBackend(BaseSearchBackend):
+    """
+    Поиск по виртуальной таблице SQLite FTS5 blog_post_fts(title, text),
+    где rowid совпадает с id поста. Ранжирование — bm25 с повышенным
+    весом заголовка.
+    """
+
+    table = "blog_post_fts"
+    title_weight = 10.0
+    text_weight = 1.0
+    snippet_tokens = 16
+
+    @staticmethod
+    def build_query(query):
+        """
+        Преобразует пользовательский ввод в запрос FTS5: каждое слово
+        берётся в кавычки (без операторов FTS) и ищется по префиксу.
+        """
+        return " ".join(f'"{word}"*' for word in re.findall(r"\w+", query))
+
+    def index_posts(self, posts):
+        rows = [(post.pk, post.title, post.text) for post in posts]
+        if not rows:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {self.table} WHERE rowid = %s",
+                [(pk,) for pk, _, _ in rows],
+            )
+            cursor.executemany(
+                f"INSERT INTO {self.table} (rowid, title, text) VALUES (%s, %s, %s)",
+                rows,
+            )
+
+    def remove_posts(self, post_ids):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {self.table} WHERE rowid = %s",
+                [(pk,) for pk in post_ids],
+            )
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+
+    def search(self, query, limit):
+        match = self.build_query(query)
+        if not match:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s "
+                f"ORDER BY bm25({self.table}, %s, %s) LIMIT %s",
+                [match, self.title_weight, self.text_weight, limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def snippets(self, query, post_ids):
+        match = self.build_query(query)
+        if not match or not post_ids:
+            return {}
+        placeholders = ", ".join(["%s"] * len(post_ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid, snippet({self.table}, -1, %s, %s, '…', %s) "
+                f"FROM {self.table} WHERE {self.table} MATCH %s "
+                f"AND rowid IN ({placeholders})",
+                [
+                    HIGHLIGHT_START,
+                    HIGHLIGHT_END,
+                    self.snippet_tokens,
+                    match,
+                    *post_ids,
+                ],
+            )
+            return {pk: highlight(fragment) for pk, fragment in cursor.fetchall()}
+
+
+class DatabaseSearchBackend(BaseSearchBackend):
+    """
+    Запасной бэкенд без отдельного индекса для баз без FTS5:
+    ищет подстроки через icontains и не ранжирует результаты.
+    """
+
+    def index_posts(self, posts):
+        pass
+
+    def remove_posts(self, post_ids):
+        pass
+
+    def clear(self):
+        pass
+
+    def search(self, query, limit):
+        words = re.findall(r"\w+", query)
+        if not words:
+            return []
+        posts = Post.objects.filter(is_published=True)
+        for word in words:
+            posts = posts.filter(Q(title__icontains=word) | Q(text__icontains=word))
+        return list(posts.values_list("pk", flat=True)[:limit])
+
+    def snippets(self, query, post_ids):
+        return {}
+
+
+@lru_cache(maxsize=None)
+def get_search_backend():
+    """
+    Возвращает экземпляр бэкенда из настройки BLOG_SEARCH_BACKEND.
+    """
+    return import_string(
+        getattr(settings, "BLOG_SEARCH_BACKEND", "blog.search.SQLiteFTSBackend")
+    )()
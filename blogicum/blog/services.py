@@ -0,0 +1,248 @@
+from contextvars import ContextVar
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.dispatch import Signal
+from django.utils.timezone import now
+
+from .cache import bump_version, bump_versions, feed_dependencies
+from .models import Comment, Post, make_excerpt, render_text_html
+from .search import get_search_backend
+
+User = get_user_model()
+
+BULK_BATCH_SIZE = 500  # Размер пакета id в запросах после массового удаления.
+
+# Отправляется после того, как отложенные посты стали видимыми
+# (аргумент post_ids). К нему подключаются сброс кешей, перестроение
+# лент и другие зависящие от видимости обработчики.
+posts_published = Signal()
+
+# Выставляется на время bulk_delete: обработчики post_delete отдельных
+# строк (счётчики комментариев, версии кеша, поисковый индекс) при этом
+# ничего не делают — всё это bulk_delete выполняет один раз за пакет.
+_bulk_delete = ContextVar("bulk_delete", default=False)
+
+
+def bulk_delete_in_progress():
+    return _bulk_delete.get()
+
+
+def adjust_comment_count(post_id, delta):
+    """
+    Атомарно изменяет счётчик комментариев поста на delta одним UPDATE,
+    без чтения поста и без повторного вызова Post.save().
+    """
+    Post.objects.filter(pk=post_id).update(
+        comment_count=F("comment_count") + delta, updated_at=now()
+    )
+    bump_version("post", post_id)
+
+
+def recount_comments(post_ids=None, batch_size=1000):
+    """
+    Сверяет счётчики комментариев с фактическим количеством.
+    Количество считается одним сгруппированным запросом, а исправляются
+    только разошедшиеся счётчики (пакетным bulk_update) вместе с updated_at,
+    от которого зависит Last-Modified страницы поста.
+    Возвращает число исправленных постов.
+    """
+    posts = Post.objects.all()
+    comments = Comment.objects.all()
+    if post_ids is not None:
+        posts = posts.filter(pk__in=post_ids)
+        comments = comments.filter(post_id__in=post_ids)
+    actual = dict(
+        comments.order_by().values_list("post_id").annotate(Count("id"))
+    )
+    moment = now()
+    drifted = [
+        Post(pk=pk, comment_count=actual.get(pk, 0), updated_at=moment)
+        for pk, comment_count in posts.order_by().values_list(
+            "pk", "comment_count"
+        ).iterator(chunk_size=batch_size)
+        if actual.get(pk, 0) != comment_count
+    ]
+    Post.objects.bulk_update(
+        drifted, ["comment_count", "updated_at"], batch_size=batch_size
+    )
+    bump_versions(*(("post", post.pk) for post in drifted))
+    return len(drifted)
+
+
+def rebuild_comment_counts(posts=None):
+    """
+    Пересчитывает Post.comment_count одним UPDATE с подзапросом COUNT(*)
+    для всех постов posts (по умолчанию — всех постов), без чтения строк
+    в Python. Подходит после массовой загрузки, когда разошлись
+    все счётчики, а не единицы, как в recount_comments.
+    Вместе со счётчиком обновляется updated_at.
+    Возвращает число обновлённых постов.
+    """
+    counts = (
+        Comment.objects.filter(post=OuterRef("pk"))
+        .order_by()
+        .values("post")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    actual = Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+    posts = Post.objects.all() if posts is None else posts
+    # Меняются только разошедшиеся счётчики: updated_at остальных постов
+    # (и Last-Modified их страниц) остаётся прежним.
+    return posts.exclude(comment_count=actual).update(
+        comment_count=actual, updated_at=now()
+    )
+
+
+def render_post_texts(posts=None, batch_size=BULK_BATCH_SIZE):
+    """
+    Заново вычисляет Post.excerpt и Post.text_html для постов posts
+    (по умолчанию — всех): после миграции, изменения EXCERPT_WORDS
+    или загрузки постов в обход Post.save(). Посты читаются пакетами
+    по возрастанию pk и записываются bulk_update; версии карточек
+    сбрасываются одним обращением к кешу на пакет.
+    Возвращает число обработанных постов.
+    """
+    posts = (Post.objects.all() if posts is None else posts).order_by("pk")
+    total = 0
+    last_pk = 0
+    while True:
+        rows = list(
+            posts.filter(pk__gt=last_pk).values_list("pk", "text")[:batch_size]
+        )
+        if not rows:
+            return total
+        Post.objects.bulk_update(
+            [
+                Post(pk=pk, excerpt=make_excerpt(text), text_html=render_text_html(text))
+                for pk, text in rows
+            ],
+            ["excerpt", "text_html"],
+        )
+        bump_versions(*(("post", pk) for pk, _ in rows))
+        total += len(rows)
+        last_pk = rows[-1][0]
+
+
+def sync_category_visibility(category):
+    """
+    Пересчитывает is_visible постов категории после изменения её флага
+    публикации — одним массовым UPDATE вместо сохранения каждого поста.
+    """
+    posts = Post.objects.filter(category=category)
+    if category.is_published:
+        return posts.filter(
+            is_visible=False, is_published=True, pub_date__lte=now()
+        ).update(is_visible=True, updated_at=now())
+    return posts.filter(is_visible=True).update(is_visible=False, updated_at=now())
+
+
+def hide_uncategorized_posts():
+    """
+    Скрывает посты, оставшиеся без категории (после удаления категории
+    ForeignKey обнуляется массовым UPDATE без вызова Post.save()).
+    Возвращает пары (id поста, id автора) скрытых постов, чтобы
+    вызывающий сбросил их кеш.
+    """
+    posts = Post.objects.filter(category=None, is_visible=True)
+    hidden = list(posts.values_list("pk", "author_id"))
+    if hidden:
+        posts.update(is_visible=False, updated_at=now())
+    return hidden
+
+
+def publish_due_posts(moment=None, batch_size=500):
+    """
+    Делает видимыми посты, дата публикации которых наступила к моменту
+    moment (по умолчанию — сейчас; в тестах передаётся фиксированное время).
+    Посты обрабатываются пакетами по batch_size, после каждого пакета
+    отправляется сигнал posts_published со списком id.
+    Возвращает число опубликованных постов.
+    """
+    moment = moment or now()
+    due = Post.objects.filter(
+        is_visible=False,
+        is_published=True,
+        pub_date__lte=moment,
+        category__is_published=True,
+    ).order_by("pub_date", "id")
+    published = 0
+    while True:
+        # Планировщик работает в каждом процессе сервера (blog.scheduler):
+        # пакет блокируется, чтобы другой процесс не опубликовал его повторно.
+        with transaction.atomic():
+            locked = due.select_for_update(of=("self",))
+            post_ids = list(locked.values_list("pk", flat=True)[:batch_size])
+            if not post_ids:
+                return published
+            Post.objects.filter(pk__in=post_ids, is_visible=False).update(
+                is_visible=True, updated_at=moment
+            )
+        posts_published.send(sender=Post, post_ids=post_ids)
+        published += len(post_ids)
+
+
+def batches(values, size=BULK_BATCH_SIZE):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def bulk_delete(queryset):
+    """
+    Удаляет пользователей, посты или комментарии queryset в одной
+    транзакции без построчных обработчиков post_delete.
+    Вместо счётчика и UPDATE на каждый удалённый комментарий счётчики
+    затронутых постов пересчитываются сгруппированным UPDATE
+    (rebuild_comment_counts), удалённые посты убираются из поискового
+    индекса одним пакетом, а версии кеша постов, пользователей и лент
+    сбрасываются одним обращением после фиксации транзакции.
+    Возвращает результат QuerySet.delete().
+    """
+    model = queryset.model
+    if model is Comment:
+        posts, comments = Post.objects.none(), queryset
+    elif model is Post:
+        posts, comments = queryset, Comment.objects.none()
+    elif model is User:
+        posts = Post.objects.filter(author__in=queryset)
+        comments = Comment.objects.filter(author__in=queryset)
+    else:
+        raise TypeError(f"bulk_delete не поддерживает модель {model.__name__}")
+
+    with transaction.atomic():
+        deleted_posts = list(
+            posts.order_by().values_list("pk", "category_id", "author_id")
+        )
+        deleted_ids = {pk for pk, _, _ in deleted_posts}
+        recount_ids = set(
+            comments.order_by().values_list("post_id", flat=True).distinct()
+        ) - deleted_ids
+        user_ids = (
+            list(queryset.values_list("pk", flat=True)) if model is User else []
+        )
+
+        token = _bulk_delete.set(True)
+        try:
+            result = queryset.delete()
+        finally:
+            _bulk_delete.reset(token)
+
+        for batch in batches(recount_ids):
+            rebuild_comment_counts(Post.objects.filter(pk__in=batch))
+        for batch in batches(deleted_ids):
+            get_search_backend().remove_posts(batch)
+
+        versions = {("post", pk) for pk in deleted_ids | recount_ids}
+        versions.update(("user", pk) for pk in user_ids)
+        for pk, category_id, author_id in deleted_posts:
+            versions.update(
+                feed_dependencies(
+                    Post(pk=pk, category_id=category_id, author_id=author_id)
+                )
+            )
+        transaction.on_commit(lambda: bump_versions(*versions))
+    return result
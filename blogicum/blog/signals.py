@@ -1,19 +1,184 @@
-from django.db.models.signals import post_save, post_delete
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from .models import Comment
+from . import feeds, images
+from .cache import bump_version, bump_versions, feed_dependencies, get_versions
+from .models import (
+    Category,
+    Comment,
+    Location,
+    Post,
+    category_table,
+    location_table,
+)
+from .search import get_search_backend
+from .services import (
+    adjust_comment_count,
+    bulk_delete_in_progress,
+    hide_uncategorized_posts,
+    posts_published,
+    sync_category_visibility,
+)
+
+User = get_user_model()
 
 
 @receiver(post_save, sender=Comment)
-def update_comment_count_on_save(sender, instance, **kwargs):
+def update_comment_count_on_save(sender, instance, created, **kwargs):
     """
-    Обновляет количество комментариев при
-    добавлении или изменении комментария.
+    Увеличивает количество комментариев при добавлении комментария.
+    Редактирование комментария счётчик не затрагивает, а только сбрасывает
+    версию поста (от неё зависит ETag страницы поста).
     """
-    instance.post.update_comment_count()
+    if created:
+        adjust_comment_count(instance.post_id, 1)
+    else:
+        bump_version("post", instance.post_id)
 
 
 @receiver(post_delete, sender=Comment)
 def update_comment_count_on_delete(sender, instance, **kwargs):
-    """Обновляет количество комментариев при удалении комментария."""
-    instance.post.update_comment_count()
+    """
+    Уменьшает количество комментариев при удалении комментария
+    (при bulk_delete счётчики пересчитываются одним UPDATE).
+    """
+    if not bulk_delete_in_progress():
+        adjust_comment_count(instance.post_id, -1)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def bump_post_version(sender, instance, signal, **kwargs):
+    """
+    Сбрасывает закешированную карточку поста и кеш страниц его лент
+    (главной, категории и профиля автора) при сохранении или удалении.
+    Сохранённый видимый пост затем вставляется в закешированные
+    синдикационные ленты; им передаются версии до сброса.
+    При bulk_delete версии сбрасываются одним пакетом.
+    """
+    if bulk_delete_in_progress():
+        return
+    pairs = [("post", instance.pk), *feed_dependencies(instance)]
+    previous = dict(zip(pairs, get_versions(*pairs)))
+    bump_versions(*pairs)
+    if signal is post_save and instance.is_visible:
+        feeds.update_feeds([instance.pk], previous)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def bump_category_version(sender, instance, **kwargs):
+    """
+    Сбрасывает карточки постов категории и таблицу категорий в памяти
+    процессов при её изменении (например, при снятии с публикации).
+    """
+    bump_version("category", instance.pk)
+    category_table.invalidate()
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def bump_location_version(sender, instance, **kwargs):
+    """
+    Сбрасывает карточки постов местоположения и таблицу
+    местоположений в памяти процессов при его изменении.
+    """
+    bump_version("location", instance.pk)
+    location_table.invalidate()
+
+
+@receiver(post_save, sender=User)
+def bump_user_version(sender, instance, update_fields=None, **kwargs):
+    """
+    Сбрасывает карточки постов автора (в них выводится имя пользователя)
+    и кеш страницы профиля. Обновление last_login при входе их не затрагивает.
+    """
+    if update_fields is None or set(update_fields) - {"last_login"}:
+        bump_version("user", instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, **kwargs):
+    """
+    Обновляет пост в поисковом индексе; снятые с публикации посты
+    из индекса удаляются.
+    """
+    if instance.is_published:
+        get_search_backend().index_posts([instance])
+    else:
+        get_search_backend().remove_posts([instance.pk])
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    """Удаляет пост из поискового индекса (при bulk_delete — пакетом)."""
+    if not bulk_delete_in_progress():
+        get_search_backend().remove_posts([instance.pk])
+
+
+@receiver(post_save, sender=Post)
+def process_post_image(sender, instance, update_fields=None, **kwargs):
+    """
+    После фиксации транзакции ставит в фоновую очередь создание
+    уменьшенных копий изображения поста.
+    """
+    if instance.image and update_fields is None:
+        name = instance.image.name
+        transaction.on_commit(lambda: images.schedule(instance.pk, name))
+
+
+@receiver(post_save, sender=Category)
+def update_category_posts_visibility(sender, instance, **kwargs):
+    """
+    Пересчитывает видимость постов при изменении категории,
+    в том числе при переключении is_published в list_editable админки.
+    Если состав видимых постов изменился, сбрасывает кеш главной
+    и профилей авторов категории.
+    """
+    if sync_category_visibility(instance):
+        bump_version("feed", "index")
+        author_ids = (
+            Post.objects.filter(category=instance)
+            .order_by()
+            .values_list("author_id", flat=True)
+            .distinct()
+        )
+        for author_id in author_ids:
+            bump_version("profile_feed", author_id)
+
+
+@receiver(post_delete, sender=Category)
+def hide_posts_of_deleted_category(sender, instance, **kwargs):
+    """
+    Скрывает посты удалённой категории и сбрасывает их карточки,
+    кеш главной и профилей их авторов.
+    """
+    hidden = hide_uncategorized_posts()
+    if hidden:
+        bump_versions(
+            ("feed", "index"),
+            *(("post", post_id) for post_id, _ in hidden),
+            *(("profile_feed", author_id) for author_id in {a for _, a in hidden}),
+        )
+
+
+@receiver(posts_published)
+def bump_published_post_versions(sender, post_ids, **kwargs):
+    """
+    Сбрасывает карточки постов, ставших видимыми по расписанию,
+    и кеш страниц их лент, после чего добавляет посты в закешированные
+    синдикационные ленты без их пересборки.
+    Поисковый индекс обновлять не нужно: в нём уже есть все опубликованные
+    посты, а видимость проверяется при поиске.
+    """
+    affected = {("feed", "index")}
+    for category_id, author_id in Post.objects.filter(pk__in=post_ids).values_list(
+        "category_id", "author_id"
+    ):
+        affected.update({("category_feed", category_id), ("profile_feed", author_id)})
+    pairs = [*(("post", post_id) for post_id in post_ids), *affected]
+    previous = dict(zip(pairs, get_versions(*pairs)))
+    bump_versions(*pairs)
+    feeds.update_feeds(post_ids, previous)
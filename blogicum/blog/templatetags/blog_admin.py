@@ -0,0 +1,50 @@
+from django import template
+from django.contrib.admin.templatetags.admin_list import date_hierarchy
+
+register = template.Library()
+
+
+class IndexedDates:
+    """
+    Обёртка над QuerySet списка админки для тега date_hierarchy.
+    Тег запрашивает одни и те же MIN/MAX дважды и передаёт в datetimes()
+    QuerySet с сортировкой, JOIN и отложенными полями списка.
+    Здесь агрегаты запоминаются, а годы (месяцы, дни) берутся одним
+    запросом datetimes() по голому QuerySet без них — SELECT DISTINCT
+    по покрывающему индексу даты (post_date_idx, comment_created_idx),
+    при переходе по датам — только по диапазону выбранного периода.
+    """
+
+    def __init__(self, queryset):
+        self.queryset = queryset
+        self.aggregates = {}
+
+    def aggregate(self, **kwargs):
+        """
+        Агрегаты запоминаются: тег запрашивает одни и те же MIN/MAX.
+        """
+        key = repr(sorted(kwargs.items()))
+        if key not in self.aggregates:
+            self.aggregates[key] = self.queryset.aggregate(**kwargs)
+        return self.aggregates[key]
+
+    def datetimes(self, field_name, kind, **kwargs):
+        queryset = self.queryset.select_related(None).order_by()
+        return queryset.datetimes(field_name, kind, **kwargs)
+
+    def dates(self, field_name, kind, **kwargs):
+        queryset = self.queryset.select_related(None).order_by()
+        return queryset.dates(field_name, kind, **kwargs)
+
+
+@register.inclusion_tag("admin/date_hierarchy.html")
+def indexed_date_hierarchy(cl):
+    """
+    Тег date_hierarchy админки с периодами из одного запроса (IndexedDates).
+    """
+    queryset = cl.queryset
+    cl.queryset = IndexedDates(queryset)
+    try:
+        return date_hierarchy(cl)
+    finally:
+        cl.queryset = queryset
@@ -0,0 +1,94 @@
+from django import template
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+from django.utils.translation import get_language
+from django_bootstrap5.forms import render_form
+
+from blog.cache import FORM_KEY, FORM_TIMEOUT, POST_CARD_TIMEOUT, post_card_key, record
+from blog.constants import PAGE_WINDOW
+from blog.images import responsive_sources
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_card(post):
+    """
+    Выводит карточку поста из кеша фрагментов, рендеря её только при промахе.
+    """
+    key = post_card_key(post)
+    html = cache.get(key)
+    record("post_card", hit=html is not None)
+    if html is None:
+        html = render_to_string("includes/post_card.html", {"post": post})
+        cache.set(key, html, POST_CARD_TIMEOUT)
+    return mark_safe(html)
+
+
+@register.simple_tag
+def cached_form(form):
+    """
+    Выводит форму как bootstrap_form. Пустая форма одинакова для всех
+    читателей, поэтому её HTML берётся из кеша фрагментов. Форма
+    с введёнными данными, начальными значениями (initial) или
+    редактируемым объектом (instance с pk) рендерится каждый раз:
+    ключ кеша их не различает.
+    """
+    instance = getattr(form, "instance", None)
+    if form.is_bound or form.initial or getattr(instance, "pk", None):
+        return render_form(form)
+    key = FORM_KEY.format(
+        name=type(form).__qualname__, prefix=form.prefix, language=get_language()
+    )
+    html = cache.get(key)
+    record("form", hit=html is not None)
+    if html is None:
+        html = render_form(form)
+        cache.set(key, html, FORM_TIMEOUT)
+    return mark_safe(html)
+
+
+@register.inclusion_tag("includes/post_image.html")
+def post_image(post, sizes="(max-width: 640px) 100vw, 640px", lazy=True):
+    """
+    Выводит изображение поста с srcset из уменьшенных копий WebP/JPEG.
+    Пока копий нет, выводится оригинал, а копии создаются в фоне.
+    """
+    return {
+        "post": post,
+        "sources": responsive_sources(post),
+        "sizes": sizes,
+        "lazy": lazy,
+    }
+
+
+@register.simple_tag
+def page_window(page_obj):
+    """
+    Номера страниц вокруг текущей (по PAGE_WINDOW с каждой стороны)
+    и первая с последней; пропуски обозначены None.
+    """
+    paginator = page_obj.paginator
+    return [
+        None if number == paginator.ELLIPSIS else number
+        for number in paginator.get_elided_page_range(
+            page_obj.number, on_each_side=PAGE_WINDOW, on_ends=1
+        )
+    ]
+
+
+@register.simple_tag(takes_context=True)
+def querystring(context, **changes):
+    """
+    Строка запроса текущей страницы с заменёнными параметрами changes
+    (None удаляет параметр): ссылки пагинации сохраняют остальные
+    параметры, например запрос поиска q.
+    """
+    query = context["request"].GET.copy()
+    for name, value in changes.items():
+        if value is None:
+            query.pop(name, None)
+        else:
+            query[name] = value
+    return f"?{query.urlencode()}"
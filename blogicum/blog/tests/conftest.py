@@ -0,0 +1,70 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.timezone import now
+
+from blog.models import Category, Location, Post
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """
+    Версии, счётчики и фрагменты живут в общем кеше процесса:
+    каждый тест начинает с пустого.
+    """
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def author(db):
+    return User.objects.create_user("author", password="password")
+
+
+@pytest.fixture
+def reader(db):
+    return User.objects.create_user("reader", password="password")
+
+
+@pytest.fixture
+def category(db):
+    return Category.objects.create(title="Категория", description="—", slug="category")
+
+
+@pytest.fixture
+def location(db):
+    return Location.objects.create(name="Место")
+
+
+@pytest.fixture
+def make_posts(author, category, location):
+    """
+    Создаёт count видимых постов одним bulk_create, с вычисленными
+    is_visible, анонсом и HTML текста, как при Post.save().
+    """
+    def make(count, **fields):
+        start = now() - timedelta(days=1)
+        posts = []
+        for number in range(count):
+            post = Post(
+                title=f"Пост {number}",
+                text="Текст поста. " * 20,
+                pub_date=start + timedelta(seconds=number),
+                author=author,
+                category=category,
+                location=location,
+                **fields,
+            )
+            post.is_visible = post.compute_visibility()
+            post.render_text()
+            posts.append(post)
+        Post.objects.bulk_create(posts)
+        # bulk_create на SQLite не возвращает id: посты перечитываются.
+        return list(Post.objects.order_by("-pk")[:count])[::-1]
+
+    return make
@@ -0,0 +1,37 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils.timezone import now
+
+from blog.management.commands.check_admin_queries import CHANGELIST_BUDGET, Command
+from blog.models import Comment, Post
+
+User = get_user_model()
+
+
+@pytest.fixture
+def staff_client(client, db):
+    client.force_login(User.objects.create_superuser("admin", password="password"))
+    return client
+
+
+@pytest.mark.parametrize("model", list(CHANGELIST_BUDGET), ids=lambda model: model.__name__)
+def test_changelist_query_budget(staff_client, make_posts, reader, model):
+    """
+    Каждый список и переход по датам (год, месяц, день) укладывается
+    в бюджет при 10 и 100 строках на странице, и число запросов
+    не зависит от числа строк и периодов.
+    """
+    posts = make_posts(150)
+    for number, post in enumerate(posts):  # Посты за три года, раз в неделю.
+        post.pub_date = now() - timedelta(days=7 * number)
+    Post.objects.bulk_update(posts, ["pub_date"])
+    Comment.objects.bulk_create(
+        [Comment(post=post, author=reader, text="—") for post in posts]
+    )
+    comments = list(Comment.objects.select_related("post"))
+    for comment in comments:  # created_at с auto_now_add задаётся после вставки.
+        comment.created_at = comment.post.pub_date
+    Comment.objects.bulk_update(comments, ["created_at"])
+    assert Command().check_changelist(staff_client, model, CHANGELIST_BUDGET[model]) == []
@@ -0,0 +1,78 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.urls import reverse
+
+from blog.cache import VERSION_KEY, feed_dependencies, post_dependencies
+from blog.models import Comment, Post
+from blog.services import rebuild_comment_counts, recount_comments
+
+
+def make_unchanged_for_a_day(post):
+    """
+    Сдвигает updated_at поста и версии его зависимостей и лент на сутки назад,
+    чтобы изменение в тесте не попало в ту же секунду Last-Modified.
+    """
+    day_ago = post.updated_at - timedelta(days=1)
+    Post.objects.filter(pk=post.pk).update(updated_at=day_ago)
+    cache.set_many(
+        {
+            VERSION_KEY.format(kind=kind, pk=pk): int(day_ago.timestamp() * 1e9)
+            for kind, pk in [*post_dependencies(post), *feed_dependencies(post)]
+        },
+        None,
+    )
+
+
+def test_new_comment_changes_last_modified(client, make_posts, reader):
+    post = make_posts(1)[0]
+    url = reverse("blog:post_detail", args=[post.pk])
+    make_unchanged_for_a_day(post)
+    before = client.get(url)["Last-Modified"]
+    Comment.objects.create(post=post, author=reader, text="Комментарий")
+    after = client.get(url, HTTP_IF_MODIFIED_SINCE=before)
+    assert after.status_code == 200
+    assert after["Last-Modified"] != before
+
+
+def test_category_rename_changes_last_modified(client, make_posts, category):
+    post = make_posts(1)[0]
+    make_unchanged_for_a_day(post)
+    urls = [reverse("blog:post_detail", args=[post.pk]), reverse("blog:index")]
+    before = {url: client.get(url)["Last-Modified"] for url in urls}
+    assert client.get(urls[0], HTTP_IF_MODIFIED_SINCE=before[urls[0]]).status_code == 304
+    category.title = "Новое название"
+    category.save()  # updated_at поста не меняется.
+    for url in urls:
+        assert client.get(url, HTTP_IF_MODIFIED_SINCE=before[url]).status_code == 200
+
+def test_recount_touches_only_drifted_posts(make_posts, reader):
+    drifted, exact = make_posts(2)
+    Comment.objects.bulk_create(
+        [Comment(post=drifted, author=reader, text="—") for _ in range(3)]
+    )
+    old = drifted.updated_at - timedelta(days=1)
+    Post.objects.update(updated_at=old)
+
+    assert recount_comments() == 1
+    drifted.refresh_from_db()
+    exact.refresh_from_db()
+    assert drifted.comment_count == 3
+    assert drifted.updated_at > old
+    assert exact.updated_at == old
+
+
+def test_rebuild_touches_only_drifted_posts(make_posts, reader):
+    drifted, exact = make_posts(2)
+    Comment.objects.bulk_create(
+        [Comment(post=drifted, author=reader, text="—") for _ in range(2)]
+    )
+    old = drifted.updated_at - timedelta(days=1)
+    Post.objects.update(updated_at=old)
+
+    assert rebuild_comment_counts() == 1
+    drifted.refresh_from_db()
+    exact.refresh_from_db()
+    assert drifted.comment_count == 2
+    assert drifted.updated_at > old
+    assert exact.updated_at == old
@@ -0,0 +1,45 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog import utils
+from blog.views import get_base_post_queryset
+from core.db import analyze
+
+
+def test_feed_count_uses_statistics_after_analyze(make_posts, monkeypatch):
+    make_posts(30)
+    monkeypatch.setattr(utils, "ESTIMATED_COUNT_THRESHOLD", 10)
+
+    def count():
+        with CaptureQueriesContext(connection) as queries:
+            value = utils.cached_count(
+                get_base_post_queryset(), [("feed", "index")], "post_visible_date_idx"
+            )
+        utils.cache.clear()
+        return value, any("COUNT(" in query["sql"] for query in queries)
+
+    assert count() == (30, True)  # Статистики нет — COUNT(*).
+    analyze()
+    assert count() == (30, False)  # Оценка по частичному индексу.
+
+
+def test_deleted_category_resets_cached_counts(make_posts, author, category):
+    make_posts(2)
+    feeds = {
+        "index": (get_base_post_queryset(), [("feed", "index")]),
+        "profile": (
+            get_base_post_queryset().filter(author=author),
+            [("user", author.pk), ("profile_feed", author.pk)],
+        ),
+    }
+    assert {name: utils.cached_count(*args) for name, args in feeds.items()} == {
+        "index": 2,
+        "profile": 2,
+    }
+
+    category.delete()  # Посты скрываются массовым UPDATE без Post.save().
+
+    assert {name: utils.cached_count(*args) for name, args in feeds.items()} == {
+        "index": 0,
+        "profile": 0,
+    }
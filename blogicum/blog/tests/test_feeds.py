@@ -0,0 +1,61 @@
+import json
+
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils.timezone import now
+
+from blog.feeds import FEED_KEY
+from blog.models import Category, Post
+
+
+def feed_titles(client):
+    response = client.get(reverse("blog:feed", args=["json"]))
+    assert response.status_code == 200
+    return [item["title"] for item in json.loads(response.content)["items"]]
+
+
+def test_republished_post_survives_incremental_update(client, make_posts, author):
+    unrelated = make_posts(2)[0]
+    hidden = Category.objects.create(
+        title="Скрытая", description="—", slug="hidden", is_published=False
+    )
+    Post.objects.create(
+        title="Снова видимый", text="Текст", pub_date=now(), author=author, category=hidden
+    )
+    assert "Снова видимый" not in feed_titles(client)  # Состояние ленты в кеше.
+
+    hidden.is_published = True
+    hidden.save()  # Пост становится видимым, версия ленты сбрасывается.
+    unrelated.title = "Изменённый"
+    unrelated.save()  # Инкрементное обновление закешированной ленты.
+
+    titles = feed_titles(client)
+    assert "Снова видимый" in titles
+    assert "Изменённый" in titles
+
+
+def test_saved_post_is_inserted_without_rebuild(client, make_posts, django_assert_num_queries):
+    post = make_posts(2)[0]
+    feed_titles(client)
+    post.title = "Изменённый"
+    post.save()
+    with django_assert_num_queries(0):
+        assert "Изменённый" in feed_titles(client)
+
+
+def test_last_modified_follows_feed_rebuilds(client, make_posts, category):
+    make_posts(2)
+    url = reverse("blog:feed", args=["json"])
+    client.get(url)
+    key = FEED_KEY.format(scope="index")
+    state = cache.get(key)
+    state["modified"] -= 24 * 60 * 60 * 10**9  # Лента собрана сутки назад.
+    cache.set(key, state)
+    before = client.get(url)["Last-Modified"]
+    assert client.get(url, HTTP_IF_MODIFIED_SINCE=before).status_code == 304
+
+    category.title = "Новое название"
+    category.save()  # Лента пересобирается, updated_at постов прежний.
+    after = client.get(url, HTTP_IF_MODIFIED_SINCE=before)
+    assert after.status_code == 200
+    assert after["Last-Modified"] != before
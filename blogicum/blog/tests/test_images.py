@@ -0,0 +1,62 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+
+from blog import images
+from blog.models import Post
+
+GPS_INFO = 0x8825  # Тег EXIF с координатами съёмки.
+ORIENTATION = 0x0112  # Тег EXIF с ориентацией снимка.
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+
+
+def jpeg_with_exif():
+    """
+    JPEG 40×20 с координатами и поворотом на 90° в EXIF.
+    """
+    exif = Image.Exif()
+    exif[GPS_INFO] = {1: "N", 2: (55.0, 45.0, 0.0)}
+    exif[ORIENTATION] = 6
+    buffer = BytesIO()
+    Image.new("RGB", (40, 20), "red").save(buffer, "JPEG", exif=exif)
+    return SimpleUploadedFile("photo.jpg", buffer.getvalue(), "image/jpeg")
+
+
+def test_original_is_stored_without_metadata(make_posts):
+    post = make_posts(1)[0]
+    post.image = jpeg_with_exif()
+    post.save()
+
+    with default_storage.open(post.image.name) as file:
+        stored = Image.open(file)
+        assert stored.format == "JPEG"
+        assert not stored.getexif()
+        assert "exif" not in stored.info
+        assert stored.size == (20, 40)  # Поворот применён к пикселям.
+    assert (post.image_width, post.image_height) == (20, 40)
+
+
+def test_missing_original_is_not_requeued(make_posts, monkeypatch):
+    post = make_posts(1)[0]
+    Post.objects.filter(pk=post.pk).update(
+        image="missing.jpg", image_width=40, image_height=20
+    )
+    post.refresh_from_db()
+    submitted = []
+
+    class Executor:
+        def submit(self, function, *args):
+            submitted.append(args)
+            function(*args)
+
+    monkeypatch.setattr(images, "_executor", Executor())
+    assert images.responsive_sources(post) is None
+    assert images.responsive_sources(post) is None
+    assert submitted == [(post.pk, "missing.jpg")]
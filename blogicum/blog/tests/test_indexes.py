@@ -0,0 +1,46 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from blog.constants import PAGINATOR
+
+
+def feed_query_plan(client, url):
+    """
+    План запроса строк ленты (SELECT из blog_post с LIMIT),
+    выполненного при открытии страницы url.
+    """
+    with CaptureQueriesContext(connection) as queries:
+        assert client.get(url).status_code == 200
+    selects = [
+        query["sql"]
+        for query in queries
+        if query["sql"].startswith("SELECT")
+        and 'FROM "blog_post"' in query["sql"]
+        and "LIMIT" in query["sql"]
+    ]
+    assert selects, "Запрос строк ленты не выполнялся."
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {selects[0]}")
+        return " ".join(str(row[-1]) for row in cursor.fetchall())
+
+
+@pytest.mark.parametrize(
+    "name, index",
+    [
+        ("index", "post_visible_date_idx"),
+        ("category", "post_visible_category_idx"),
+        ("profile", "post_author_date_idx"),
+    ],
+)
+def test_feed_queries_use_indexes(client, make_posts, author, category, name, index):
+    make_posts(PAGINATOR * 3)
+    url = {
+        "index": reverse("blog:index"),
+        "category": reverse("blog:category_posts", args=[category.slug]),
+        "profile": reverse("blog:profile", args=[author.username]),
+    }[name]
+    plan = feed_query_plan(client, url)
+    assert f"USING INDEX {index}" in plan
+    assert "USE TEMP B-TREE" not in plan
@@ -0,0 +1,20 @@
+from blog import lookups
+from blog.models import Category, category_table
+
+
+def test_missing_slug_reloads_table_once_per_window(
+    django_assert_num_queries, category, monkeypatch
+):
+    with django_assert_num_queries(1):  # Загрузка таблицы.
+        assert category_table.get_by_slug(category.slug) == category
+    with django_assert_num_queries(0):  # Таблица только что прочитана.
+        for _ in range(3):
+            assert category_table.get_by_slug("missing") is None
+
+    # Категория, созданная без сигналов, находится после истечения срока.
+    Category.objects.bulk_create(
+        [Category(title="Новая", description="—", slug="bulk")]
+    )
+    monkeypatch.setattr(lookups, "LOOKUP_MISS_TIMEOUT", 0)
+    with django_assert_num_queries(1):
+        assert category_table.get_by_slug("bulk").title == "Новая"
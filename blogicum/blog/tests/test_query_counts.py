@@ -0,0 +1,65 @@
+import pytest
+from django.urls import reverse
+
+from blog.constants import COMMENTS_PER_PAGE
+from blog.models import Comment
+from blog.services import rebuild_comment_counts
+
+# Число запросов страниц не зависит от количества постов и комментариев.
+# Кеш пуст, поэтому в бюджет входит загрузка таблиц поиска категорий
+# и местоположений (по запросу на таблицу, см. blog.lookups).
+FEED_QUERIES = 3  # Строки ленты и две таблицы поиска.
+DETAIL_QUERIES = 4  # Пост, две таблицы поиска и страница комментариев.
+SESSION_QUERIES = 2  # Сессия и пользователь для вошедшего читателя.
+
+
+@pytest.mark.parametrize("count", [1, 100, 1000])
+@pytest.mark.parametrize("page", ["index", "category"])
+def test_feed_query_count(
+    client, django_assert_num_queries, make_posts, category, page, count
+):
+    make_posts(count)
+    url = {
+        "index": reverse("blog:index"),
+        "category": reverse("blog:category_posts", args=[category.slug]),
+    }[page]
+    with django_assert_num_queries(FEED_QUERIES):
+        assert client.get(url).status_code == 200
+
+
+@pytest.mark.parametrize("logged_in", [False, True])
+@pytest.mark.parametrize("count", [1, 100, 1000])
+def test_post_detail_query_count(
+    client, django_assert_num_queries, make_posts, reader, count, logged_in
+):
+    post = make_posts(1)[0]
+    Comment.objects.bulk_create(
+        [Comment(post=post, author=reader, text="—") for _ in range(count)]
+    )
+    rebuild_comment_counts()
+    expected = DETAIL_QUERIES
+    if logged_in:
+        client.force_login(reader)
+        expected += SESSION_QUERIES
+    with django_assert_num_queries(expected):
+        response = client.get(reverse("blog:post_detail", args=[post.pk]))
+    assert response.status_code == 200
+    assert response.content.count(b'name="comment_') == min(count, COMMENTS_PER_PAGE)
+
+
+PROFILE_QUERIES = 4  # Пользователь, строки ленты и две таблицы поиска.
+
+
+@pytest.mark.parametrize("owner", [False, True])
+@pytest.mark.parametrize("count", [1, 100, 1000])
+def test_profile_query_count(
+    client, django_assert_num_queries, make_posts, author, count, owner
+):
+    make_posts(count)
+    expected = PROFILE_QUERIES
+    if owner:
+        client.force_login(author)
+        expected += SESSION_QUERIES
+    with django_assert_num_queries(expected):
+        response = client.get(reverse("blog:profile", args=[author.username]))
+    assert response.status_code == 200
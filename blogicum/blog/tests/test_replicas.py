@@ -0,0 +1,49 @@
+import sqlite3
+
+import pytest
+from django.db import connection, connections
+from django.urls import reverse
+
+STALE = "stale_replica"
+
+
+@pytest.fixture
+def stale_replica(transactional_db, settings, tmp_path):
+    """
+    Реплика — копия основной базы на момент вызова snapshot();
+    всё, что записано позже, на ней не видно.
+    """
+    path = str(tmp_path / "replica.sqlite3")
+
+    def snapshot():
+        connection.ensure_connection()
+        target = sqlite3.connect(path)
+        try:
+            connection.connection.backup(target)
+        finally:
+            target.close()
+        connections.databases[STALE] = {**connection.settings_dict, "NAME": path}
+        settings.REPLICA_DATABASES = [STALE]
+
+    yield snapshot
+    if STALE in connections.databases:
+        connections[STALE].close()
+        del connections[STALE]
+        del connections.databases[STALE]
+
+
+def test_logged_in_user_is_served_from_stale_replica(
+    client, stale_replica, make_posts, author
+):
+    make_posts(3)
+    stale_replica()
+    client.force_login(author)  # Сессия есть только на основной базе.
+
+    index = client.get(reverse("blog:index"))
+    assert index.status_code == 200
+    assert reverse("logout").encode() in index.content
+
+    profile = client.get(reverse("blog:profile", args=[author.username]))
+    assert profile.status_code == 200
+    assert reverse("logout").encode() in profile.content
+    assert reverse("blog:edit_profile").encode() in profile.content
@@ -0,0 +1,35 @@
+import time
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils.timezone import now
+
+from blog.models import Post
+from blog.scheduler import Scheduler
+
+
+@pytest.mark.django_db(transaction=True)
+def test_due_post_appears_on_index_once_scheduler_runs(client, author, category):
+    post = Post.objects.create(
+        title="Отложенный",
+        text="Текст",
+        pub_date=now() + timedelta(days=1),
+        author=author,
+        category=category,
+    )
+    # Дата наступила: массовый UPDATE не пересчитывает is_visible.
+    Post.objects.filter(pk=post.pk).update(pub_date=now() - timedelta(minutes=1))
+    index = reverse("blog:index")
+    assert "Отложенный" not in client.get(index).content.decode()
+
+    scheduler = Scheduler(interval=0.01).start()
+    try:
+        deadline = time.monotonic() + 5
+        while not Post.objects.filter(pk=post.pk, is_visible=True).exists():
+            assert time.monotonic() < deadline, "Планировщик не опубликовал пост."
+            time.sleep(0.01)
+    finally:
+        scheduler.stop(timeout=5)
+
+    assert "Отложенный" in client.get(index).content.decode()
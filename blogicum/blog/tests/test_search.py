@@ -0,0 +1,86 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils.http import urlencode
+from django.utils.timezone import now
+
+from blog.constants import PAGINATOR
+from blog.management.commands.rebuild_search_index import Command
+from blog.models import Category, Post
+from blog.search import get_search_backend
+
+
+@pytest.fixture
+def make_post(author, category):
+    """
+    Создаёт пост через save(), чтобы сигнал добавил его в поисковый индекс.
+    """
+    def make(title, text="Текст", **fields):
+        fields = {"pub_date": now() - timedelta(hours=1), "category": category, **fields}
+        return Post.objects.create(title=title, text=text, author=author, **fields)
+
+    return make
+
+
+def search(client, query, **params):
+    response = client.get(reverse("blog:search"), {"q": query, **params})
+    assert response.status_code == 200
+    return response
+
+
+def test_pagination_links_keep_query(client, make_post):
+    for number in range(PAGINATOR + 1):
+        make_post(f"Слон {number}")
+
+    first = search(client, "слон").content.decode()
+    assert f'href="?{urlencode({"q": "слон", "page": 2})}"'.replace("&", "&amp;") in first
+
+    second = search(client, "слон", page=2)
+    assert len(second.context["page_obj"]) == 1
+    assert second.context["query"] == "слон"
+
+
+def test_title_matches_rank_above_text_matches(make_post):
+    in_text = make_post("Заметка", text="Сегодня видели слона в зоопарке.")
+    in_title = make_post("Слон", text="Большое животное.")
+    assert get_search_backend().search("слон", 10) == [in_title.pk, in_text.pk]
+
+
+def test_snippet_escapes_post_text(client, make_post):
+    make_post("Заметка", text="<script>alert(1)</script> слон в <b>зоопарке</b>")
+    html = search(client, "слон").content.decode()
+    assert "<script>alert(1)</script>" not in html
+    assert "&lt;script&gt;" in html
+    assert "<mark>слон</mark>" in html
+
+
+def test_invisible_posts_are_not_found(client, make_post):
+    hidden = Category.objects.create(
+        title="Скрытая", description="—", slug="hidden", is_published=False
+    )
+    visible = make_post("Слон видимый")
+    make_post("Слон в скрытой категории", category=hidden)
+    make_post("Слон отложенный", pub_date=now() + timedelta(days=1))
+    make_post("Слон снятый", is_published=False)
+
+    page_obj = search(client, "слон").context["page_obj"]
+    assert [post.pk for post in page_obj] == [visible.pk]
+
+
+def test_rebuild_keeps_old_index_until_commit(make_post, monkeypatch):
+    post = make_post("Слон")
+    backend = get_search_backend()
+
+    def failing_chunks():
+        assert backend.search("слон", 10) == []  # Внутри транзакции индекс пуст.
+        yield [post]
+        raise RuntimeError("Сбой чтения постов")
+
+    with pytest.raises(RuntimeError):
+        backend.rebuild(failing_chunks())
+    assert backend.search("слон", 10) == [post.pk]  # Старый индекс на месте.
+
+    Post.objects.filter(pk=post.pk).update(title="Жираф")
+    assert backend.rebuild(Command.chunks(chunk_size=10)) == 1
+    assert backend.search("жираф", 10) == [post.pk]
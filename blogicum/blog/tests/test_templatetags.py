@@ -0,0 +1,13 @@
+from blog.forms import CommentForm
+from blog.models import Comment
+from blog.templatetags.blog_tags import cached_form
+
+
+def test_cached_form_does_not_reuse_html_of_filled_forms(make_posts, reader):
+    post = make_posts(1)[0]
+    comment = Comment.objects.create(post=post, author=reader, text="Мой комментарий")
+
+    assert "Мой комментарий" not in cached_form(CommentForm())
+    assert "Мой комментарий" in cached_form(CommentForm(instance=comment))
+    assert "Начальный текст" in cached_form(CommentForm(initial={"text": "Начальный текст"}))
+    assert "Мой комментарий" not in cached_form(CommentForm())
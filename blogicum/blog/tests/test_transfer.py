@@ -0,0 +1,20 @@
+import pytest
+
+from blog.models import Comment, Location
+from blog.transfer import export_blog, import_blog
+
+
+@pytest.mark.parametrize("fmt", ["jsonl", "csv"])
+def test_round_trip_keeps_blank_text(tmp_path, make_posts, reader, fmt):
+    post = make_posts(1)[0]
+    Location.objects.filter(pk=post.location_id).update(name="")
+    Comment.objects.create(post=post, author=reader, text="")
+
+    export_blog(tmp_path, fmt)
+    counts = import_blog(tmp_path, fmt)
+
+    assert counts == {"categories": 0, "locations": 1, "posts": 1, "comments": 1}
+    imported = Comment.objects.select_related("post__location").latest("pk")
+    assert imported.text == ""
+    assert imported.post.location.name == ""
+    assert imported.post.image.name in ("", None)
@@ -0,0 +1,377 @@
+import csv
+import json
+import os
+from contextlib import contextmanager
+from datetime import datetime
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import now
+
+from core.db import analyze
+
+from .cache import bump_version
+from .datagen import next_pk
+from .models import Category, Comment, Location, Post
+from .search import get_search_backend
+from .services import rebuild_comment_counts
+
+User = get_user_model()
+
+FORMATS = ("jsonl", "csv")  # Поддерживаемые форматы файлов выгрузки.
+
+# Столбцы выгрузки: (имя столбца, поле для values_list).
+# Внешние ключи выгружаются естественными ключами там, где они есть
+# (slug категории, имя пользователя), иначе — исходным id.
+# Файлы перечислены в порядке загрузки: зависимости раньше зависимых.
+COLUMNS = {
+    "categories": (
+        Category,
+        [
+            ("id", "id"),
+            ("title", "title"),
+            ("description", "description"),
+            ("slug", "slug"),
+            ("is_published", "is_published"),
+            ("created_at", "created_at"),
+        ],
+    ),
+    "locations": (
+        Location,
+        [
+            ("id", "id"),
+            ("name", "name"),
+            ("is_published", "is_published"),
+            ("created_at", "created_at"),
+        ],
+    ),
+    "posts": (
+        Post,
+        [
+            ("id", "id"),
+            ("title", "title"),
+            ("text", "text"),
+            ("pub_date", "pub_date"),
+            ("author", "author__username"),
+            ("category", "category__slug"),
+            ("location", "location_id"),
+            ("image", "image"),
+            ("is_published", "is_published"),
+            ("created_at", "created_at"),
+        ],
+    ),
+    "comments": (
+        Comment,
+        [
+            ("id", "id"),
+            ("post", "post_id"),
+            ("author", "author__username"),
+            ("text", "text"),
+            ("created_at", "created_at"),
+        ],
+    ),
+}
+
+
+def file_path(directory, name, fmt):
+    return os.path.join(directory, f"{name}.{fmt}")
+
+
+def encode(value):
+    """
+    Значение для записи в файл: даты — в ISO 8601.
+    """
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def write_rows(path, fmt, columns, rows):
+    """
+    Записывает строки в файл по одной, не накапливая их в памяти.
+    Возвращает число записанных строк.
+    """
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        if fmt == "csv":
+            writer = csv.writer(file)
+            writer.writerow(columns)
+        for row in rows:
+            row = [encode(value) for value in row]
+            if fmt == "csv":
+                writer.writerow(["" if value is None else value for value in row])
+            else:
+                file.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False))
+                file.write("\n")
+            count += 1
+    return count
+
+
+def nullable_columns(name):
+    """
+    Столбцы выгрузки name, в которых может быть отсутствующее значение:
+    внешние ключи и поля с null=True.
+    """
+    model, columns = COLUMNS[name]
+    nullable = set()
+    for column, path in columns:
+        field = model._meta.get_field(path.split("__")[0].removesuffix("_id"))
+        if field.null or field.is_relation:
+            nullable.add(column)
+    return nullable
+
+
+def read_rows(path, fmt, nullable=()):
+    """
+    Читает файл построчно и возвращает словари.
+    В CSV пустая строка в столбцах nullable означает отсутствующее
+    значение; в остальных это пустой текст.
+    """
+    with open(path, encoding="utf-8", newline="") as file:
+        if fmt == "csv":
+            for row in csv.DictReader(file):
+                yield {
+                    key: None if value == "" and key in nullable else value
+                    for key, value in row.items()
+                }
+        else:
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def parse_bool(value):
+    return value in (True, "True", "true", "1", 1)
+
+
+def export_blog(directory, fmt="jsonl", chunk_size=2000):
+    """
+    Выгружает категории, местоположения, посты и комментарии в файлы
+    <модель>.<формат> каталога directory. Строки читаются курсором
+    частями по chunk_size (iterator), поэтому память не растёт
+    с размером базы. Возвращает {имя файла: число строк}.
+    """
+    os.makedirs(directory, exist_ok=True)
+    counts = {}
+    for name, (model, columns) in COLUMNS.items():
+        rows = (
+            model.objects.order_by("pk")
+            .values_list(*(field for _, field in columns))
+            .iterator(chunk_size=chunk_size)
+        )
+        counts[name] = write_rows(
+            file_path(directory, name, fmt),
+            fmt,
+            [column for column, _ in columns],
+            rows,
+        )
+    return counts
+
+
+@contextmanager
+def preserve_timestamps(*fields):
+    """
+    Временно отключает auto_now/auto_now_add у полей, чтобы bulk_create
+    сохранил даты из выгрузки, а не текущее время.
+    """
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Importer:
+    """
+    Загрузка выгрузки export_blog пакетными bulk_create.
+    Внешние ключи сопоставляются через словари в памяти:
+    slug категории и имя пользователя — с существующими записями,
+    исходные id местоположений и постов — с новыми id. Новые записи
+    получают явные первичные ключи (bulk_create на SQLite не возвращает id).
+    Сигналы post_save при bulk_create не отправляются, поэтому счётчики
+    комментариев пересчитываются в конце одним UPDATE.
+    """
+
+    def __init__(self, directory, fmt="jsonl", batch_size=2000):
+        self.directory = directory
+        self.fmt = fmt
+        self.batch_size = batch_size
+        self.moment = now()
+        self.categories = {}  # slug -> Category
+        self.locations = {}  # исходный id -> новый id
+        self.posts = {}  # исходный id -> новый id
+        self.users = {}  # имя пользователя -> id
+        self.first_post_pk = None
+        self.touched_categories = set()
+
+    def run(self):
+        """
+        Загружает все найденные файлы в одной транзакции.
+        Возвращает {имя файла: число загруженных строк}.
+        """
+        counts = {}
+        fields = [
+            Category._meta.get_field("created_at"),
+            Location._meta.get_field("created_at"),
+            Post._meta.get_field("created_at"),
+            Post._meta.get_field("updated_at"),
+            Comment._meta.get_field("created_at"),
+        ]
+        with transaction.atomic(), preserve_timestamps(*fields):
+            # Существующие категории читаются одним запросом, а не по строке.
+            self.categories = Category.objects.in_bulk(field_name="slug")
+            for name in COLUMNS:
+                path = file_path(self.directory, name, self.fmt)
+                if os.path.exists(path):
+                    counts[name] = self.load(
+                        name, read_rows(path, self.fmt, nullable_columns(name))
+                    )
+            if self.first_post_pk is not None:
+                rebuild_comment_counts(Post.objects.filter(pk__gte=self.first_post_pk))
+        analyze()  # Статистика для планировщика и оценки числа строк.
+        self.invalidate_feeds()
+        return counts
+
+    def load(self, name, rows):
+        """
+        Загружает строки пакетами по batch_size.
+        """
+        build = getattr(self, f"build_{name}")
+        model = COLUMNS[name][0]
+        next_id = next_pk(model)
+        loaded = 0
+        batch = []
+        for row in rows:
+            obj = build(row, next_id)
+            if obj is None:
+                continue
+            batch.append(obj)
+            next_id += 1
+            if len(batch) >= self.batch_size:
+                loaded += self.flush(model, batch)
+                batch = []
+        loaded += self.flush(model, batch)
+        return loaded
+
+    def flush(self, model, batch):
+        if not batch:
+            return 0
+        if model in (Post, Comment):
+            self.resolve_users(batch)
+        model.objects.bulk_create(batch)
+        if model is Post:
+            get_search_backend().index_posts(
+                [post for post in batch if post.is_published]
+            )
+        return len(batch)
+
+    def resolve_users(self, batch):
+        """
+        Подставляет id авторов пакета; недостающие пользователи создаются
+        без пароля (вход для них невозможен до сброса пароля).
+        """
+        missing = {obj._username for obj in batch} - self.users.keys()
+        if missing:
+            self.users.update(
+                User.objects.filter(username__in=missing).values_list("username", "pk")
+            )
+            new = sorted(missing - self.users.keys())
+            if new:
+                user_pk = next_pk(User)
+                User.objects.bulk_create(
+                    [
+                        User(pk=user_pk + index, username=username, password="!")
+                        for index, username in enumerate(new)
+                    ]
+                )
+                self.users.update(
+                    (username, user_pk + index) for index, username in enumerate(new)
+                )
+        for obj in batch:
+            obj.author_id = self.users[obj._username]
+
+    def build_categories(self, row, pk):
+        if row["slug"] in self.categories:  # Категория уже есть — используется она.
+            return None
+        category = Category(
+            pk=pk,
+            title=row["title"],
+            description=row["description"],
+            slug=row["slug"],
+            is_published=parse_bool(row["is_published"]),
+            created_at=parse_datetime(row["created_at"]),
+        )
+        self.categories[row["slug"]] = category
+        return category
+
+    def build_locations(self, row, pk):
+        self.locations[int(row["id"])] = pk
+        return Location(
+            pk=pk,
+            name=row["name"],
+            is_published=parse_bool(row["is_published"]),
+            created_at=parse_datetime(row["created_at"]),
+        )
+
+    def build_posts(self, row, pk):
+        if self.first_post_pk is None:
+            self.first_post_pk = pk
+        self.posts[int(row["id"])] = pk
+        category = self.categories.get(row["category"]) if row["category"] else None
+        if row["category"] and category is None:
+            raise Category.DoesNotExist(f"Категория {row['category']!r} не найдена.")
+        created_at = parse_datetime(row["created_at"])
+        post = Post(
+            pk=pk,
+            title=row["title"],
+            text=row["text"],
+            pub_date=parse_datetime(row["pub_date"]),
+            category=category,
+            location_id=(
+                self.locations.get(int(row["location"])) if row["location"] else None
+            ),
+            image=row["image"] or None,
+            is_published=parse_bool(row["is_published"]),
+            created_at=created_at,
+            updated_at=created_at,
+        )
+        post.is_visible = post.compute_visibility(self.moment)
+        post.render_text()
+        post._username = row["author"]
+        if category is not None:
+            self.touched_categories.add(category.pk)
+        return post
+
+    def build_comments(self, row, pk):
+        post_id = self.posts.get(int(row["post"]))
+        if post_id is None:  # Комментарий к посту не из этой выгрузки.
+            return None
+        comment = Comment(
+            pk=pk,
+            post_id=post_id,
+            text=row["text"],
+            created_at=parse_datetime(row["created_at"]),
+        )
+        comment._username = row["author"]
+        return comment
+
+    def invalidate_feeds(self):
+        """
+        Сбрасывает кеш лент, в которые попали загруженные посты.
+        """
+        bump_version("feed", "index")
+        for category_id in self.touched_categories:
+            bump_version("category_feed", category_id)
+        for author_id in self.users.values():
+            bump_version("profile_feed", author_id)
+
+
+def import_blog(directory, fmt="jsonl", batch_size=2000):
+    """
+    Загружает выгрузку export_blog из каталога directory.
+    """
+    return Importer(directory, fmt, batch_size).run()
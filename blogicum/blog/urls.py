@@ -2,26 +2,49 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.urls import path
 
-from . import views
+from . import async_views, feeds, views
 from .views import (
     PostCreateView,
     PostDeleteView,
     PostDetailView,
     PostUpdateView,
     UserUpdateView,
-    profile_view,
 )
 
 app_name = "blog"  # Указывает пространство имен для приложения "blog".
 
+# Под ASGI страницы чтения можно обслуживать асинхронными представлениями.
+if getattr(settings, "BLOG_ASYNC_VIEWS", False):
+    index = async_views.index
+    category_posts = async_views.category_posts
+    post_detail = async_views.post_detail
+    profile_view = async_views.profile_view
+else:
+    index = views.index
+    category_posts = views.category_posts
+    post_detail = PostDetailView.as_view()
+    profile_view = views.profile_view
+
 # Список URL-маршрутов приложения
 urlpatterns = [
-    path("", views.index, name="index"),  # Главная страница блога.
+    path("", index, name="index"),  # Главная страница блога.
     path(
         "category/<slug:category_slug>/",
-        views.category_posts,
+        category_posts,
         name="category_posts"  # Посты, относящиеся к определенной категории.
     ),
+    path("feeds/<str:fmt>/", feeds.index_feed, name="feed"),  # Лента RSS/Atom/JSON.
+    path(
+        "feeds/<str:fmt>/category/<slug:category_slug>/",
+        feeds.category_feed,
+        name="category_feed"  # Лента постов категории.
+    ),
+    path(
+        "feeds/<str:fmt>/profile/<str:username>/",
+        feeds.profile_feed,
+        name="profile_feed"  # Лента постов автора.
+    ),
+    path("search/", views.search, name="search"),  # Полнотекстовый поиск по постам.
     path("posts/create/", PostCreateView.as_view(), name="create_post"),  # Создание нового поста.
     path("posts/<int:pk>/comment/", views.add_comment, name="add_comment"),  # Добавление комментария.
     path(
@@ -40,7 +63,7 @@ urlpatterns = [
         PostDeleteView.as_view(),
         name="delete_post"  # Удаление поста.
     ),
-    path("posts/<int:pk>/", PostDetailView.as_view(), name="post_detail"),  # Просмотр деталей поста.
+    path("posts/<int:pk>/", post_detail, name="post_detail"),  # Просмотр деталей поста.
     path("profile/edit/", UserUpdateView.as_view(), name="edit_profile"),  # Редактирование профиля.
     path("profile/<str:username>/", profile_view, name="profile"),  # Просмотр профиля пользователя.
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)  # Обработка медиафайлов в режиме разработки.
@@ -1,10 +1,407 @@
+import asyncio
+import hashlib
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
 from django.core.paginator import Paginator
+from django.db import close_old_connections
+from django.db.models import Q
+from django.shortcuts import render
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+from django.utils.http import (
+    http_date,
+    quote_etag,
+    urlsafe_base64_decode,
+    urlsafe_base64_encode,
+)
+
+from core.db import estimated_count
+
+from .cache import (
+    add_page_dependencies,
+    get_versions,
+    post_card_key,
+    post_dependencies,
+    post_versions,
+    record,
+    version_time,
+)
+from .constants import (
+    ESTIMATED_COUNT_THRESHOLD,
+    HTTP_CACHE_MAX_AGE,
+    PAGINATION_MODE,
+)
+
+COUNT_KEY = "blog:count:{digest}"  # Ключ числа объектов ленты: хеш SQL запроса.
+COUNT_TIMEOUT = 60 * 60 * 24  # Время жизни числа объектов в кеше (сутки).
+
+CURSOR_NEXT = "n"  # Направление курсора: следующая (более старая) страница.
+CURSOR_PREVIOUS = "p"  # Направление курсора: предыдущая (более новая) страница.
+
+
+def cached_count(queryset, dependencies, index=None):
+    """
+    Число объектов ленты для постраничной пагинации без COUNT(*)
+    на каждый запрос. Значение хранится в кеше вместе с версиями
+    dependencies — пар (вид, pk) лент, которые сбрасываются при
+    появлении и исчезновении постов (blog.cache.feed_dependencies).
+    При промахе для таблицы больше ESTIMATED_COUNT_THRESHOLD строк
+    берётся оценка по статистике (core.db.estimated_count): всей таблицы
+    для запроса без фильтров или частичного индекса index, условие
+    которого совпадает с фильтром ленты. Иначе выполняется COUNT(*).
+    """
+    digest = hashlib.md5(str(queryset.query).encode()).hexdigest()
+    key = COUNT_KEY.format(digest=digest)
+    versions = get_versions(*dependencies)
+    entry = cache.get(key)
+    if entry is not None and entry[1] == versions:
+        record("count", True)
+        return entry[0]
+    record("count", False)
+    count = estimate_count(queryset, index)
+    if count is None:
+        count = queryset.count()
+    # Лента, изменившаяся во время подсчёта, могла получить неверное число.
+    if get_versions(*dependencies) == versions:
+        cache.set(key, (count, versions), COUNT_TIMEOUT)
+    return count
 
 
-def paginate_queryset(queryset, request, per_page):
+def estimate_count(queryset, index=None):
+    """
+    Оценка числа объектов по статистике или None, если таблица
+    небольшая, статистики нет или запрос не покрывается index.
+    """
+    if queryset.query.where and index is None:
+        return None
+    estimate = estimated_count(
+        queryset.model,
+        queryset.db,
+        index=index if queryset.query.where else None,
+    )
+    if estimate is None or estimate < ESTIMATED_COUNT_THRESHOLD:
+        return None
+    return estimate
+
+
+def paginate_queryset(queryset, request, per_page, dependencies=(), index=None):
     """
     Пагинация для переданного набора данных (queryset).
+    Если заданы dependencies, число объектов берётся из кеша (cached_count).
     """
     paginator = Paginator(queryset, per_page)  # Создаём объект пагинатора.
+    if dependencies:
+        paginator.count = cached_count(queryset, dependencies, index)
     page_number = request.GET.get("page")  # Получаем номер текущей страницы из параметров запроса.
     return paginator.get_page(page_number)  # Возвращаем объект текущей страницы.
+
+
+def encode_cursor(direction, post):
+    """
+    Кодирует позицию поста (pub_date, id) в непрозрачный токен для URL.
+    """
+    payload = json.dumps([direction, post.pub_date.isoformat(), post.pk])
+    return urlsafe_base64_encode(payload.encode())
+
+
+def decode_cursor(token):
+    """
+    Раскодирует токен курсора.
+    Возвращает (направление, pub_date, id) или None, если токен некорректен.
+    """
+    if not token:
+        return None
+    try:
+        direction, pub_date, pk = json.loads(urlsafe_base64_decode(token))
+        pub_date = parse_datetime(pub_date)
+        pk = int(pk)
+    except (TypeError, ValueError):
+        return None
+    if direction not in (CURSOR_NEXT, CURSOR_PREVIOUS) or pub_date is None:
+        return None
+    return direction, pub_date, pk
+
+
+class CursorPage:
+    """
+    Страница курсорной пагинации.
+    В отличие от Page не знает общего числа объектов и номера страницы.
+    """
+
+    is_cursor = True
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f"<CursorPage next={self.next_cursor} previous={self.previous_cursor}>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор списков админки: для запроса без фильтров число строк
+    берётся из статистики базы (core.db.estimated_count) вместо COUNT(*),
+    который на большой таблице дороже самой страницы. Таблицы меньше
+    ESTIMATED_COUNT_THRESHOLD и отфильтрованные списки считаются точно.
+    """
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, "query", None)
+        if query is not None and not query.where:
+            estimate = estimated_count(self.object_list.model, self.object_list.db)
+            if estimate is not None and estimate >= ESTIMATED_COUNT_THRESHOLD:
+                return estimate
+        return super().count
+
+
+class CursorPaginator:
+    """
+    Курсорная (keyset) пагинация по ключу (pub_date, id) в порядке убывания,
+    что совпадает с Post.Meta.ordering = ["-pub_date"].
+    Не выполняет COUNT(*) и OFFSET: каждая страница — это запрос
+    "строки после ключа" с LIMIT per_page + 1. Избыточное условие
+    pub_date <= ключа позволяет SQLite начать поиск по индексу сразу с ключа.
+    """
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset
+        self.per_page = per_page
+
+    def get_page(self, cursor):
+        """
+        Возвращает страницу для токена курсора.
+        Некорректный или пустой токен даёт первую страницу.
+        """
+        position = decode_cursor(cursor)
+        limit = self.per_page + 1
+        if position is None:
+            rows = list(self.queryset.order_by("-pub_date", "-id")[:limit])
+            return self._forward_page(rows, has_previous=False)
+
+        direction, pub_date, pk = position
+        if direction == CURSOR_NEXT:
+            rows = list(
+                self.queryset.filter(pub_date__lte=pub_date)
+                .filter(Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, id__lt=pk))
+                .order_by("-pub_date", "-id")[:limit]
+            )
+            return self._forward_page(rows, has_previous=True)
+
+        rows = list(
+            self.queryset.filter(pub_date__gte=pub_date)
+            .filter(Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, id__gt=pk))
+            .order_by("pub_date", "id")[:limit]
+        )
+        has_previous = len(rows) > self.per_page
+        rows = rows[:self.per_page][::-1]  # Возвращаем порядок "новые сверху".
+        return CursorPage(
+            rows,
+            next_cursor=encode_cursor(CURSOR_NEXT, rows[-1]) if rows else None,
+            previous_cursor=(
+                encode_cursor(CURSOR_PREVIOUS, rows[0]) if has_previous else None
+            ),
+        )
+
+    def _forward_page(self, rows, has_previous):
+        """
+        Собирает страницу при движении от новых постов к старым.
+        """
+        has_next = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        return CursorPage(
+            rows,
+            next_cursor=encode_cursor(CURSOR_NEXT, rows[-1]) if has_next else None,
+            previous_cursor=(
+                encode_cursor(CURSOR_PREVIOUS, rows[0])
+                if has_previous and rows else None
+            ),
+        )
+
+
+def paginate_cursor(queryset, request, per_page):
+    """
+    Курсорная пагинация для ленты постов.
+    """
+    paginator = CursorPaginator(queryset, per_page)
+    return paginator.get_page(request.GET.get("cursor"))
+
+
+def paginate_feed(
+    queryset, request, per_page, mode=PAGINATION_MODE, dependencies=(), index=None
+):
+    """
+    Пагинация ленты постов в выбранном режиме:
+    "cursor" — курсорная, "numbered" — постраничная с номерами страниц
+    (dependencies и index передаются в cached_count).
+    """
+    if mode == "cursor":
+        return paginate_cursor(queryset, request, per_page)
+    return paginate_queryset(queryset, request, per_page, dependencies, index)
+
+
+def in_thread(function):
+    """
+    Асинхронная обёртка для запроса к базе в отдельном потоке пула:
+    несколько таких запросов выполняются одновременно (asyncio.gather),
+    каждый на своём соединении. После запроса соединение потока
+    закрывается по правилам CONN_MAX_AGE, как в конце обычного запроса.
+    """
+    def run(*args, **kwargs):
+        try:
+            return function(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    return sync_to_async(run, thread_sensitive=False)
+
+
+def page_number(request):
+    """
+    Номер страницы из параметра page (некорректный номер — первая страница).
+    """
+    try:
+        return max(int(request.GET.get("page") or 1), 1)
+    except ValueError:
+        return 1
+
+
+def page_slice(queryset, number, per_page):
+    """
+    Строки страницы number без проверки номера (для одновременной загрузки).
+    """
+    bottom = (number - 1) * per_page
+    return list(queryset[bottom:bottom + per_page])
+
+
+async def afinish_page(paginator, rows, number):
+    """
+    Собирает страницу из заранее загруженных строк, когда число объектов
+    известно. Номер за пределами списка даёт последнюю страницу,
+    как Paginator.get_page.
+    """
+    if number > paginator.num_pages:
+        return await in_thread(paginator.get_page)(number)
+    return paginator._get_page(rows, number, paginator)
+
+
+async def apaginate_queryset(queryset, request, per_page, dependencies=(), index=None):
+    """
+    Асинхронная постраничная пагинация: строки страницы и число объектов
+    (COUNT(*) или cached_count) запрашиваются одновременно.
+    """
+    paginator = Paginator(queryset, per_page)
+    number = page_number(request)
+    if dependencies:
+        count = in_thread(cached_count)(queryset, dependencies, index)
+    else:
+        count = in_thread(queryset.count)()
+    paginator.count, rows = await asyncio.gather(
+        count,
+        in_thread(page_slice)(queryset, number, per_page),
+    )
+    return await afinish_page(paginator, rows, number)
+
+
+async def apaginate_feed(
+    queryset, request, per_page, mode=PAGINATION_MODE, dependencies=(), index=None
+):
+    """
+    Асинхронный вариант paginate_feed.
+    """
+    if mode == "cursor":
+        return await in_thread(paginate_cursor)(queryset, request, per_page)
+    return await apaginate_queryset(queryset, request, per_page, dependencies, index)
+
+
+def page_validators(request, page_obj, *dependencies):
+    """
+    Составляющие ETag и Last-Modified ленты, вычисляемые без рендеринга:
+    ключи карточек постов страницы (id и версии поста, автора, категории,
+    локации), версии dependencies (пары (вид, pk), например лента
+    категории) и наличие соседних страниц. Время — последний сброс этих
+    же версий (version_time), а не updated_at постов: updated_at
+    не меняется при переименовании автора, категории или локации.
+    Те же зависимости регистрируются для кеша страниц.
+    """
+    posts = list(page_obj)
+    add_page_dependencies(
+        request,
+        *dependencies,
+        *(item for post in posts for item in post_dependencies(post)),
+    )
+    parts = [post_card_key(post) for post in posts]
+    versions = [version for post in posts for version in post_versions(post)]
+    if dependencies:
+        dependency_versions = get_versions(*dependencies)
+        parts += dependency_versions
+        versions += dependency_versions
+    parts += [page_obj.has_previous(), page_obj.has_next()]
+    return parts, version_time(versions)
+
+
+def render_conditional(request, template_name, context, etag_parts, last_modified=None):
+    """
+    Отвечает 304 Not Modified, если у клиента актуальная версия страницы,
+    иначе рендерит шаблон. ETag строится из etag_parts, адреса страницы
+    и (для авторизованных) пользователя и CSRF-куки.
+    Анонимным ответам разрешено публичное кеширование на HTTP_CACHE_MAX_AGE
+    секунд, авторизованным — только в браузере с перепроверкой.
+    Авторизованным Last-Modified не отправляется: пользователя и CSRF-куку
+    учитывает только ETag.
+    """
+    etag_parts = [request.get_full_path(), *etag_parts]
+    authenticated = request.user.is_authenticated
+    if authenticated:
+        etag_parts += [
+            request.user.pk,
+            *get_versions(("user", request.user.pk)),
+            request.COOKIES.get(settings.CSRF_COOKIE_NAME),
+        ]
+    etag = quote_etag(hashlib.md5(repr(etag_parts).encode()).hexdigest())
+    # Last-Modified передаётся с точностью до секунды: с дробной частью
+    # время всегда позже If-Modified-Since, и 304 не отдаётся.
+    timestamp = (
+        int(last_modified.timestamp()) if last_modified and not authenticated else None
+    )
+
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None:
+        response = render(request, template_name, context)
+    response["ETag"] = etag
+    if timestamp is not None:
+        response["Last-Modified"] = http_date(timestamp)
+    if authenticated:
+        patch_cache_control(response, private=True, no_cache=True)
+    else:
+        patch_cache_control(response, public=True, max_age=HTTP_CACHE_MAX_AGE)
+    patch_vary_headers(response, ("Cookie",))
+    return response
@@ -1,67 +1,177 @@
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.models import User
+from django.core.paginator import Paginator
 from django.db.models import Q
+from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse, reverse_lazy
-from django.utils.timezone import now
+from django.utils.decorators import method_decorator
 from django.views.generic import CreateView, DeleteView, DetailView, UpdateView
 
-from .constants import PAGINATOR
+from core.routers import replica_reads
+
+from .cache import (
+    add_page_dependencies,
+    post_card_key,
+    post_dependencies,
+    post_versions,
+    version_time,
+)
+from .constants import COMMENTS_PER_PAGE, PAGINATOR, SEARCH_MAX_RESULTS
 from .forms import CommentForm, FormPost
 from .mixins import OnlyAuthorMixin
-from .models import Category, Comment, Post
-from .utils import paginate_queryset
+from .models import Comment, Post, category_table
+from .search import get_search_backend
+from .services import bulk_delete
+from .utils import (
+    page_validators,
+    paginate_feed,
+    paginate_queryset,
+    render_conditional,
+)
 
 
 def get_base_post_queryset():
     """
     Получить базовый QuerySet для постов с фильтром публикации.
+    Видимость поддерживается при записи в поле Post.is_visible.
+    Категории и местоположения берутся из таблиц поиска в памяти,
+    полный текст и его HTML не читаются: карточкам нужен только excerpt.
+    """
+    return (
+        Post.objects.filter(is_visible=True)
+        .select_related("author")
+        .defer("text", "text_html")
+        .with_lookups()
+    )
+
+
+def get_published_category(slug):
+    """
+    Опубликованная категория по слагу из таблицы поиска или 404.
     """
-    return Post.objects.filter(
-        is_published=True,
-        pub_date__lte=now(),
-        category__is_published=True,
-    ).select_related("category", "author", "location")
+    category = category_table.get_by_slug(slug)
+    if category is None or not category.is_published:
+        raise Http404("Категория не найдена.")
+    return category
 
 
+@replica_reads
 def index(request):
     """
     Главная страница блога, отображает список постов.
     """
-    posts = get_base_post_queryset().filter(is_published=True)
-    page_obj = paginate_queryset(posts, request, PAGINATOR)
-    return render(request, "blog/index.html", {"page_obj": page_obj})
+    posts = get_base_post_queryset()
+    page_obj = paginate_feed(
+        posts,
+        request,
+        PAGINATOR,
+        dependencies=[("feed", "index")],
+        index="post_visible_date_idx",  # Частичный индекс по is_visible=True.
+    )
+    return render_index(request, page_obj)
+
+
+def render_index(request, page_obj):
+    """
+    Ответ главной страницы с проверкой ETag/Last-Modified.
+    """
+    etag_parts, last_modified = page_validators(request, page_obj, ("feed", "index"))
+    return render_conditional(
+        request, "blog/index.html", {"page_obj": page_obj}, etag_parts, last_modified
+    )
 
 
+@replica_reads
 def category_posts(request, category_slug):
     """
     Страница, отображающая посты конкретной категории.
     """
-    category = get_object_or_404(Category, slug=category_slug, is_published=True)
-    posts = get_base_post_queryset().filter(category=category, is_published=True)
-    page_obj = paginate_queryset(posts, request, PAGINATOR)
-    return render(
-        request, "blog/category.html", {"category": category, "page_obj": page_obj}
+    category = get_published_category(category_slug)
+    posts = get_base_post_queryset().filter(category=category)
+    page_obj = paginate_feed(
+        posts,
+        request,
+        PAGINATOR,
+        dependencies=[("category", category.pk), ("category_feed", category.pk)],
+    )
+    return render_category(request, category, page_obj)
+
+
+def render_category(request, category, page_obj):
+    """
+    Ответ страницы категории с проверкой ETag/Last-Modified.
+    """
+    etag_parts, last_modified = page_validators(
+        request,
+        page_obj,
+        ("category", category.pk),
+        ("category_feed", category.pk),
+    )
+    return render_conditional(
+        request,
+        "blog/category.html",
+        {"category": category, "page_obj": page_obj},
+        etag_parts,
+        last_modified,
     )
 
 
+@replica_reads
 def profile_view(request, username):
     """
     Страница профиля пользователя с его постами.
     """
     user = get_object_or_404(User, username=username)
-    if request.user == user:
-        posts = Post.objects.filter(author=user)
-    else:
-        posts = Post.objects.filter(author=user, is_published=True, pub_date__lte=now())
-    page_obj = paginate_queryset(posts, request, PAGINATOR)
+    posts = Post.objects.filter(author=user)
+    if request.user != user:
+        posts = posts.filter(is_visible=True)
+    posts = posts.select_related("author").defer("text", "text_html").with_lookups()
+    page_obj = paginate_feed(
+        posts,
+        request,
+        PAGINATOR,
+        dependencies=[("user", user.pk), ("profile_feed", user.pk)],
+    )
+    return render_profile(request, user, page_obj)
+
+
+def render_profile(request, user, page_obj):
+    """
+    Ответ страницы профиля с проверкой ETag/Last-Modified.
+    """
     context = {
         "profile": user,
         "page_obj": page_obj,
         "is_owner": request.user == user,
     }
-    return render(request, "blog/profile.html", context)
+    etag_parts, last_modified = page_validators(
+        request, page_obj, ("user", user.pk), ("profile_feed", user.pk)
+    )
+    return render_conditional(
+        request, "blog/profile.html", context, etag_parts, last_modified
+    )
+
+
+def search(request):
+    """
+    Полнотекстовый поиск по постам с ранжированием и подсветкой совпадений.
+    Показываются только посты, видимые в общей ленте.
+    """
+    query = request.GET.get("q", "").strip()
+    posts = []
+    if query:
+        backend = get_search_backend()
+        ranked_ids = backend.search(query, SEARCH_MAX_RESULTS)
+        found = get_base_post_queryset().in_bulk(ranked_ids)
+        posts = [found[pk] for pk in ranked_ids if pk in found]
+    page_obj = paginate_queryset(posts, request, PAGINATOR)
+    if query:
+        snippets = backend.snippets(query, [post.pk for post in page_obj])
+        for post in page_obj:
+            post.snippet = snippets.get(post.pk)
+    return render(request, "blog/search.html", {"query": query, "page_obj": page_obj})
 
 
 class UserUpdateView(LoginRequiredMixin, UpdateView):
@@ -113,6 +223,7 @@ class PostUpdateView(LoginRequiredMixin, OnlyAuthorMixin, UpdateView):
         return super().form_valid(form)
 
 
+@method_decorator(replica_reads, name="get")
 class PostDetailView(DetailView):
     """
     Просмотр деталей поста.
@@ -122,35 +233,61 @@ class PostDetailView(DetailView):
     template_name = "blog/detail.html"
     context_object_name = "post"
 
-    def get_object(self, queryset=None):
-        queryset = self.get_queryset()
-        if not self.request.user.is_authenticated:
-            queryset = queryset.filter(
-                is_published=True, pub_date__lte=now(), category__is_published=True
-            )
-        else:
-            queryset = queryset.filter(
-                Q(
-                    is_published=True,
-                    pub_date__lte=now(),
-                    category__is_published=True,
-                )
-                | Q(author=self.request.user)
-            )
-
-        obj = get_object_or_404(queryset, pk=self.kwargs.get("pk"))
-        if obj.pub_date > now() and obj.author != self.request.user:
-            return get_object_or_404(Post, pk=None)
-
-        return obj
+    def get_queryset(self):
+        """
+        Посты, доступные текущему пользователю: опубликованные
+        и, для авторизованного пользователя, его собственные.
+        Связанные объекты для шаблона загружаются тем же запросом.
+        """
+        visible = Q(is_visible=True)
+        if self.request.user.is_authenticated:
+            visible |= Q(author=self.request.user)
+        return (
+            Post.objects.filter(visible)
+            .select_related("author")
+            .defer("text")
+            .with_lookups()
+        )
+
+    def get(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        return render_post_detail(request, self.get_context_data(object=self.object))
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["form"] = CommentForm()
-        context["comments"] = self.object.comments.all()
+        paginator = Paginator(get_comments_queryset(self.object.pk), COMMENTS_PER_PAGE)
+        paginator.count = self.object.comment_count  # Счётчик уже известен, COUNT(*) не нужен.
+        context["comments"] = paginator.get_page(self.request.GET.get("page"))
         return context
 
 
+def get_comments_queryset(post_id):
+    """
+    Комментарии поста вместе с авторами.
+    """
+    return Comment.objects.filter(post_id=post_id).select_related("author")
+
+
+def render_post_detail(request, context):
+    """
+    Ответ страницы поста: 304 Not Modified, если пост (время изменения,
+    число комментариев и версии связанных объектов) не менялся.
+    Last-Modified — позднейшее из updated_at и времени сброса версий:
+    правка комментария и переименование автора, категории или локации
+    меняют только версии.
+    """
+    post = context["post"]
+    add_page_dependencies(request, *post_dependencies(post))
+    return render_conditional(
+        request,
+        "blog/detail.html",
+        context,
+        [post_card_key(post), post.updated_at, post.comment_count],
+        max(post.updated_at, version_time(post_versions(post))),
+    )
+
+
 class PostDeleteView(OnlyAuthorMixin, LoginRequiredMixin, DeleteView):
     """
     Удаление поста.
@@ -170,6 +307,15 @@ class PostDeleteView(OnlyAuthorMixin, LoginRequiredMixin, DeleteView):
             "blog:profile", kwargs={"username": self.request.user.username}
         )
 
+    def delete(self, request, *args, **kwargs):
+        """
+        Удаляет пост вместе с комментариями через bulk_delete:
+        без обновления счётчика на каждый удалённый комментарий.
+        """
+        self.object = self.get_object()
+        bulk_delete(Post.objects.filter(pk=self.object.pk))
+        return redirect(self.get_success_url())
+
 
 @login_required
 def add_comment(request, pk):
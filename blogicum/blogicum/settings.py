@@ -1,10 +1,17 @@
+import os
+import tempfile
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = "django-insecure-w6n^@ocl*1)#hychhku002hoaeydu8psxfua$cx1(0-!rhcus)"
 
-DEBUG = True
+# Профиль окружения: development или production. От него зависят значения
+# по умолчанию для DEBUG, кеша шаблонов и PRAGMA SQLite; каждое можно
+# переопределить своей переменной окружения.
+PROFILE = os.environ.get("BLOGICUM_PROFILE", "development")
+
+DEBUG = os.environ.get("BLOGICUM_DEBUG", "0" if PROFILE == "production" else "1") == "1"
 
 ALLOWED_HOSTS = [
     "localhost",
@@ -26,6 +33,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "core.middleware.RequestStatsMiddleware",
+    "blog.middleware.AnonymousPageCacheMiddleware",
+    "core.middleware.PrimaryPinningMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -39,12 +49,29 @@ ROOT_URLCONF = "blogicum.urls"
 
 TEMPLATES_DIR = BASE_DIR / "templates"
 
+# Кеш скомпилированных шаблонов в памяти процесса: шаблоны читаются
+# и разбираются один раз (при старте — core.templates.warm_templates),
+# а не на каждом запросе. В разработке выключен, чтобы правки
+# шаблонов подхватывались без перезапуска.
+TEMPLATE_CACHE = os.environ.get("BLOGICUM_TEMPLATE_CACHE", "0" if DEBUG else "1") == "1"
+
+TEMPLATE_LOADERS = [
+    "django.template.loaders.filesystem.Loader",
+    "django.template.loaders.app_directories.Loader",
+]
+
+# Бэкенд DjangoTemplates с замером времени рендеринга
+# (core.middleware.RequestStatsMiddleware).
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "BACKEND": "core.templates.TimedDjangoTemplates",
         "DIRS": [TEMPLATES_DIR],
-        "APP_DIRS": True,
         "OPTIONS": {
+            "loaders": (
+                [("django.template.loaders.cached.Loader", TEMPLATE_LOADERS)]
+                if TEMPLATE_CACHE
+                else TEMPLATE_LOADERS
+            ),
             "context_processors": [
                 "django.template.context_processors.debug",
                 "django.template.context_processors.request",
@@ -57,13 +84,84 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "blogicum.wsgi.application"
 
+# Профиль PRAGMA для SQLite (core.db.SQLITE_PROFILES): baseline, development, production.
+SQLITE_PROFILE = os.environ.get("BLOGICUM_SQLITE_PROFILE", PROFILE)
+
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        "NAME": os.environ.get("BLOGICUM_DB_NAME", BASE_DIR / "db.sqlite3"),
+        # Время жизни соединения (с): 0 — новое соединение на каждый запрос.
+        "CONN_MAX_AGE": int(os.environ.get("BLOGICUM_CONN_MAX_AGE", 0)),
     }
 }
 
+# Реплики для чтения: пути к файлам через запятую, например
+# BLOGICUM_REPLICA_NAMES=replica.sqlite3 (копия создаётся командой sync_replicas).
+# В тестах реплики указывают на тестовую основную базу (MIRROR).
+REPLICA_DATABASES = []
+for index, name in enumerate(
+    filter(None, os.environ.get("BLOGICUM_REPLICA_NAMES", "").split(",")), start=1
+):
+    DATABASES[f"replica{index}"] = {
+        **DATABASES["default"],
+        "NAME": name,
+        "TEST": {"MIRROR": "default"},
+    }
+    REPLICA_DATABASES.append(f"replica{index}")
+
+DATABASE_ROUTERS = ["core.routers.PrimaryReplicaRouter"]
+
+# Приложения, модели которых читаются с реплик (core.routers).
+REPLICA_APPS = ["blog"]
+
+REPLICA_PIN_SECONDS = 10  # Сколько секунд после записи пользователь читает с основной базы.
+
+# Общий кеш всех процессов сервера: в нём хранятся версии (blog.cache),
+# по которым сбрасываются таблицы поиска, карточки постов, счётчики
+# и синдикационные ленты. Кеш в памяти процесса (LocMemCache) для этого
+# не подходит — сброс в одном процессе не увидят другие (см. blog.checks).
+# BLOGICUM_MEMCACHED=host:port[,host:port] — Memcached (нужен pymemcache),
+# иначе файловый кеш в BLOGICUM_CACHE_DIR, общий для процессов одной машины.
+MEMCACHED_LOCATIONS = list(
+    filter(None, os.environ.get("BLOGICUM_MEMCACHED", "").split(","))
+)
+if MEMCACHED_LOCATIONS:
+    DEFAULT_CACHE = {
+        "BACKEND": "django.core.cache.backends.memcached.PyMemcacheCache",
+        "LOCATION": MEMCACHED_LOCATIONS,
+    }
+else:
+    DEFAULT_CACHE = {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ.get(
+            "BLOGICUM_CACHE_DIR", os.path.join(tempfile.gettempdir(), "blogicum-cache")
+        ),
+        "OPTIONS": {"MAX_ENTRIES": 10_000},
+    }
+
+CACHES = {
+    "default": DEFAULT_CACHE,
+    "pages": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "blogicum-pages",
+        "TIMEOUT": 600,
+        "OPTIONS": {
+            "MAX_ENTRIES": 1000,  # При переполнении вытесняются давно не читавшиеся страницы.
+            "CULL_FREQUENCY": 10,
+        },
+    },
+}
+
+BLOG_PAGE_CACHE = False  # Кеш целых страниц блога для анонимов (blog.middleware).
+
+BLOG_PAGE_CACHE_ALIAS = "pages"  # Кеш из CACHES для страниц.
+
+BLOG_PAGE_CACHE_TIMEOUT = 600  # Время жизни страницы в кеше (с).
+
+# Асинхронные страницы чтения (blog.async_views) для запуска под ASGI.
+BLOG_ASYNC_VIEWS = os.environ.get("BLOGICUM_ASYNC_VIEWS", "") == "1"
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -80,6 +178,17 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+REQUEST_STATS_SLOW_MS = 500  # Порог (мс), после которого запрос пишется в лог вместе с SQL.
+
+BLOG_SEARCH_BACKEND = "blog.search.SQLiteFTSBackend"  # Бэкенд полнотекстового поиска постов.
+
+IMAGE_WORKERS = 2  # Потоки фоновой обработки изображений постов.
+
+# Интервал (с) публикации отложенных постов фоновым потоком процесса
+# сервера (blog.scheduler). 0 — поток не запускается, и тогда посты
+# должен публиковать отдельный процесс publish_scheduled --loop.
+BLOG_PUBLISH_INTERVAL = float(os.environ.get("BLOGICUM_PUBLISH_INTERVAL", "30"))
+
 CSRF_FAILURE_VIEW = "pages.views.csrf_failure"
 
 LOGIN_REDIRECT_URL = 'blog:index'
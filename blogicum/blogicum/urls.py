@@ -2,6 +2,7 @@ from django.contrib import admin
 from django.urls import include, path, reverse_lazy
 from django.views.generic import CreateView
 
+from core.views import request_stats
 from .forms import CustomUserCreationForm
 
 # Обработчики ошибок
@@ -22,4 +23,5 @@ urlpatterns = [
         name="registration",
     ),
     path("pages/", include("pages.urls", namespace="pages")),  # Маршруты для статических страниц
+    path("stats/", request_stats, name="request_stats"),  # Статистика запросов (для персонала)
 ]
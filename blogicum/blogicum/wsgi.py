@@ -5,3 +5,13 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
 
 application = get_wsgi_application()
+
+from blog.scheduler import start_scheduler  # noqa: E402 — после настройки Django.
+from core.templates import warm_templates  # noqa: E402
+
+# Шаблоны компилируются при старте, а не первыми запросами (если включён
+# TEMPLATE_CACHE).
+warm_templates()
+
+# Отложенные посты публикуются фоновым потоком (BLOG_PUBLISH_INTERVAL).
+start_scheduler()
@@ -4,3 +4,16 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        """
+        Подключает настройку соединений с базой данных
+        и учёт SQL-запросов для статистики.
+        """
+        from django.db.backends.signals import connection_created
+
+        from .db import configure_connection
+        from .middleware import install_query_recorder
+
+        connection_created.connect(configure_connection)
+        connection_created.connect(install_query_recorder)
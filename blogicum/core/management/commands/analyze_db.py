@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from core.db import analyze
+
+
+class Command(BaseCommand):
+    """
+    Команда для обновления статистики планировщика (ANALYZE).
+    generate_data и import_blog обновляют её сами; после обычного роста
+    базы команду стоит запускать периодически (например, из cron).
+    """
+
+    help = (
+        "Обновляет статистику базы данных (ANALYZE). По ней выбираются "
+        "индексы и оценивается число строк лент и списков админки "
+        "без COUNT(*)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database", default="default", help="Псевдоним базы данных."
+        )
+
+    def handle(self, *args, **options):
+        analyze(options["database"])
+        self.stdout.write(self.style.SUCCESS("Статистика обновлена."))
@@ -0,0 +1,36 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core.routers import PRIMARY
+
+
+class Command(BaseCommand):
+    """
+    Команда для локальной проверки реплик на SQLite: копирует основную базу
+    в файлы реплик. Настоящую репликацию она не заменяет — реплика
+    отстаёт до следующего запуска, что и нужно для проверки закрепления
+    чтения за основной базой после записи.
+    """
+
+    help = "Копирует основную базу SQLite в файлы реплик из REPLICA_DATABASES."
+
+    def handle(self, *args, **options):
+        if not settings.REPLICA_DATABASES:
+            raise CommandError(
+                "Реплики не настроены: задайте BLOGICUM_REPLICA_NAMES."
+            )
+        primary = connections[PRIMARY]
+        if primary.vendor != "sqlite":
+            raise CommandError("Команда поддерживает только SQLite.")
+        primary.ensure_connection()
+        for alias in settings.REPLICA_DATABASES:
+            connections[alias].close()  # Файл реплики перезаписывается целиком.
+            target = sqlite3.connect(connections[alias].settings_dict["NAME"])
+            try:
+                primary.connection.backup(target)
+            finally:
+                target.close()
+            self.stdout.write(self.style.SUCCESS(f"{alias} обновлена"))
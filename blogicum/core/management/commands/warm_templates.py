@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.templates import warm_templates
+
+
+class Command(BaseCommand):
+    """
+    Команда для проверки прогрева шаблонов перед выкладкой: компилирует
+    все шаблоны так же, как это делается при старте WSGI/ASGI-процесса,
+    и сообщает о синтаксических ошибках. Кеш загрузчика живёт в памяти
+    процесса, поэтому сервер прогревается сам (blogicum/wsgi.py, asgi.py).
+    """
+
+    help = (
+        "Компилирует все шаблоны проекта и приложений, выводит самые "
+        "медленные и завершается ошибкой, если какой-то шаблон не разбирается."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--top", type=int, default=10, help="Сколько самых медленных шаблонов вывести."
+        )
+
+    def handle(self, *args, **options):
+        results = warm_templates(force=True)
+        errors = {name: error for name, error in results.items() if isinstance(error, str)}
+        timings = {name: ms for name, ms in results.items() if name not in errors}
+        for name, ms in sorted(timings.items(), key=lambda item: -item[1])[: options["top"]]:
+            self.stdout.write(f"{ms:>9.3f} мс  {name}")
+        self.stdout.write(
+            f"Скомпилировано шаблонов: {len(timings)} за {sum(timings.values()):.1f} мс"
+        )
+        if errors:
+            for name, error in errors.items():
+                self.stderr.write(f"{name}: {error}")
+            raise CommandError(f"Шаблонов с ошибками: {len(errors)}")
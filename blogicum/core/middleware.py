@@ -0,0 +1,201 @@
+import asyncio
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from django.conf import settings
+
+from .routers import pin_to_primary, unpin
+from .stats import record_request
+from .templates import render_timer
+
+logger = logging.getLogger(__name__)
+
+_query_recorder = ContextVar("query_recorder", default=None)
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS", "TRACE")
+PRIMARY_PIN_COOKIE = "primary_pin"  # Кука закрепления чтения за основной базой.
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Постоянная обёртка выполнения SQL каждого соединения: передаёт запрос
+    записывающему объекту текущего HTTP-запроса, если он есть.
+    Объект берётся из ContextVar, поэтому запросы учитываются и тогда,
+    когда асинхронное представление выполняет их в других потоках.
+    """
+    recorder = _query_recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """
+    Обработчик сигнала connection_created: подключает record_query
+    к соединению (один раз, соединение может переоткрываться).
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def async_mode(middleware, get_response):
+    """
+    Переводит middleware в асинхронный режим, если следующий обработчик
+    асинхронный (так же, как django.utils.deprecation.MiddlewareMixin),
+    чтобы под ASGI запрос не переключался в отдельный поток.
+    """
+    if asyncio.iscoroutinefunction(get_response):
+        middleware._is_coroutine = asyncio.coroutines._is_coroutine
+        return True
+    return False
+
+
+class QueryRecorder:
+    """
+    Обёртка выполнения SQL (connection.execute_wrapper),
+    записывающая текст и длительность каждого запроса.
+    """
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, (time.perf_counter() - started) * 1000))
+
+
+class RequestStatsMiddleware:
+    """
+    Считает для каждого запроса количество и время SQL-запросов,
+    повторяющиеся запросы и время рендеринга шаблонов.
+    Результат отдаётся в заголовке Server-Timing и накапливается
+    по имени представления; медленные запросы пишутся в лог вместе с SQL.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = async_mode(self, get_response)
+        self.slow_ms = getattr(settings, "REQUEST_STATS_SLOW_MS", 500)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        recorder, timer = QueryRecorder(), {"ms": 0.0, "depth": 0}
+        tokens = _query_recorder.set(recorder), render_timer.set(timer)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _query_recorder.reset(tokens[0])
+            render_timer.reset(tokens[1])
+        return self.finish(request, response, recorder, timer, started)
+
+    async def __acall__(self, request):
+        recorder, timer = QueryRecorder(), {"ms": 0.0, "depth": 0}
+        tokens = _query_recorder.set(recorder), render_timer.set(timer)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _query_recorder.reset(tokens[0])
+            render_timer.reset(tokens[1])
+        return self.finish(request, response, recorder, timer, started)
+
+    def finish(self, request, response, recorder, timer, started):
+        """
+        Сохраняет замеры запроса, ставит Server-Timing и пишет
+        медленный запрос в лог.
+        """
+        total_ms = (time.perf_counter() - started) * 1000
+
+        sql_ms = sum(duration for _, duration in recorder.queries)
+        fingerprints = Counter(sql for sql, _ in recorder.queries)
+        duplicates = {sql: count for sql, count in fingerprints.items() if count > 1}
+        match = getattr(request, "resolver_match", None)
+        view_name = match.view_name if match else "<unresolved>"
+        record_request(
+            view_name, len(recorder.queries), sql_ms, timer["ms"], total_ms, duplicates
+        )
+
+        response["Server-Timing"] = ", ".join(
+            (
+                f'sql;dur={sql_ms:.2f};desc="{len(recorder.queries)} queries"',
+                f"render;dur={timer['ms']:.2f}",
+                f"total;dur={total_ms:.2f}",
+            )
+        )
+        if total_ms >= self.slow_ms:
+            logger.warning(
+                "Медленный запрос %s %s (%s): %.1f мс, SQL %.1f мс в %d запросах\n%s",
+                request.method,
+                request.get_full_path(),
+                view_name,
+                total_ms,
+                sql_ms,
+                len(recorder.queries),
+                "\n".join(
+                    f"{duration:8.2f} мс  {sql}" for sql, duration in recorder.queries
+                ),
+            )
+        return response
+
+
+class PrimaryPinningMiddleware:
+    """
+    Закрепляет чтение за основной базой, чтобы пользователь сразу видел
+    свои изменения, которые ещё не дошли до реплик.
+    Запросы с изменяющими методами (POST и т. п.) целиком читают
+    с основной базы и ставят куку на REPLICA_PIN_SECONDS секунд;
+    пока кука есть, основная база используется и для чтения.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = async_mode(self, get_response)
+        self.pin_seconds = getattr(settings, "REPLICA_PIN_SECONDS", 10)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        token = pin_to_primary(self.reads_from_primary(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            unpin(token)
+        return self.finish(request, response)
+
+    async def __acall__(self, request):
+        token = pin_to_primary(self.reads_from_primary(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            unpin(token)
+        return self.finish(request, response)
+
+    @staticmethod
+    def reads_from_primary(request):
+        return (
+            request.method not in SAFE_METHODS
+            or PRIMARY_PIN_COOKIE in request.COOKIES
+        )
+
+    def finish(self, request, response):
+        """
+        После изменяющего запроса закрепляет пользователя за основной базой.
+        """
+        if request.method not in SAFE_METHODS:
+            response.set_cookie(
+                PRIMARY_PIN_COOKIE, "1", max_age=self.pin_seconds, samesite="Lax"
+            )
+        return response
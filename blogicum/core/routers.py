@@ -0,0 +1,93 @@
+import asyncio
+import random
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+
+PRIMARY = "default"  # Псевдоним основной базы: все записи идут сюда.
+
+_replica_reads = ContextVar("replica_reads", default=False)
+_pinned = ContextVar("pinned_to_primary", default=False)
+
+
+def replica_reads(view):
+    """
+    Декоратор представления только для чтения: запросы на чтение внутри
+    него направляются на реплики (если они настроены и пользователь
+    не закреплён за основной базой после своей записи).
+    Подходит и для асинхронных представлений: флаг передаётся в потоки
+    sync_to_async вместе с контекстом.
+    """
+    if asyncio.iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(*args, **kwargs):
+            token = _replica_reads.set(True)
+            try:
+                return await view(*args, **kwargs)
+            finally:
+                _replica_reads.reset(token)
+
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        token = _replica_reads.set(True)
+        try:
+            return view(*args, **kwargs)
+        finally:
+            _replica_reads.reset(token)
+
+    return wrapper
+
+
+def pin_to_primary(pinned=True):
+    """
+    Закрепляет чтение текущего запроса за основной базой.
+    Возвращает токен для сброса через unpin(token).
+    """
+    return _pinned.set(pinned)
+
+
+def unpin(token):
+    """
+    Снимает закрепление, установленное pin_to_primary.
+    """
+    _pinned.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """
+    Маршрутизатор основная база / реплики.
+    Запись, миграции и все чтения вне представлений, помеченных
+    replica_reads, выполняются на основной базе. Внутри таких представлений
+    чтение моделей приложений REPLICA_APPS распределяется случайно между
+    псевдонимами REPLICA_DATABASES. Сессии, пользователи и типы содержимого
+    всегда читаются с основной базы: на отстающей реплике только что
+    вошедший пользователь выглядел бы анонимом.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = getattr(settings, "REPLICA_DATABASES", [])
+        if (
+            replicas
+            and _replica_reads.get()
+            and not _pinned.get()
+            and model._meta.app_label in getattr(settings, "REPLICA_APPS", [])
+        ):
+            return random.choice(replicas)
+        return PRIMARY
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики — копии основной базы, поэтому связи между объектами
+        # из разных псевдонимов допустимы.
+        databases = {PRIMARY, *getattr(settings, "REPLICA_DATABASES", [])}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY
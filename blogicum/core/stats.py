@@ -0,0 +1,76 @@
+from collections import Counter, defaultdict
+from threading import Lock
+
+DUPLICATES_LIMIT = 10  # Сколько самых частых дублирующихся запросов хранить на представление.
+
+_views = defaultdict(
+    lambda: {
+        "requests": 0,
+        "queries": 0,
+        "sql_ms": 0.0,
+        "render_ms": 0.0,
+        "total_ms": 0.0,
+        "duplicates": Counter(),
+    }
+)
+_lock = Lock()
+_providers = {}
+
+
+def record_request(view_name, queries, sql_ms, render_ms, total_ms, duplicates):
+    """
+    Добавляет замеры одного запроса к накопленной статистике представления.
+    """
+    with _lock:
+        entry = _views[view_name]
+        entry["requests"] += 1
+        entry["queries"] += queries
+        entry["sql_ms"] += sql_ms
+        entry["render_ms"] += render_ms
+        entry["total_ms"] += total_ms
+        entry["duplicates"].update(duplicates)
+        if len(entry["duplicates"]) > DUPLICATES_LIMIT:
+            # Хранятся только самые частые запросы, иначе счётчик растёт
+            # с каждым новым текстом SQL до конца жизни процесса.
+            entry["duplicates"] = Counter(
+                dict(entry["duplicates"].most_common(DUPLICATES_LIMIT))
+            )
+
+
+def register_stats_provider(name, provider):
+    """
+    Регистрирует функцию без аргументов, чьи данные (например, счётчики
+    кешей) выводятся вместе со статистикой запросов.
+    """
+    _providers[name] = provider
+
+
+def snapshot():
+    """
+    Возвращает статистику по представлениям и данные зарегистрированных
+    поставщиков в виде, пригодном для JSON.
+    """
+    with _lock:
+        views = {
+            name: {
+                "requests": entry["requests"],
+                "avg_queries": round(entry["queries"] / entry["requests"], 2),
+                "avg_sql_ms": round(entry["sql_ms"] / entry["requests"], 3),
+                "avg_render_ms": round(entry["render_ms"] / entry["requests"], 3),
+                "avg_total_ms": round(entry["total_ms"] / entry["requests"], 3),
+                "duplicates": dict(entry["duplicates"].most_common(DUPLICATES_LIMIT)),
+            }
+            for name, entry in _views.items()
+        }
+    return {
+        "views": views,
+        **{name: provider() for name, provider in _providers.items()},
+    }
+
+
+def reset():
+    """
+    Очищает накопленную статистику запросов.
+    """
+    with _lock:
+        _views.clear()
@@ -0,0 +1,100 @@
+import os
+import time
+from contextvars import ContextVar
+
+from django.template import TemplateSyntaxError, engines
+from django.template.backends.django import DjangoTemplates, Template
+from django.template.loaders.cached import Loader as CachedLoader
+from django.template.utils import get_app_template_dirs
+
+# Прогрев кеша шаблонов: при старте процесса все шаблоны проекта
+# и приложений компилируются заранее, чтобы первые запросы к каждой
+# странице не читали и не разбирали файлы с диска.
+
+# Замер времени рендеринга для core.middleware.RequestStatsMiddleware:
+# middleware кладёт сюда словарь текущего запроса, TimedTemplate
+# прибавляет к нему время рендеринга.
+render_timer = ContextVar("render_timer", default=None)
+
+
+class TimedTemplate(Template):
+    """
+    Шаблон бэкенда TimedDjangoTemplates: суммирует время рендеринга
+    шаблонов верхнего уровня в текущем запросе (вложенные вызовы
+    не учитываются повторно).
+    """
+
+    def render(self, context=None, request=None):
+        timer = render_timer.get()
+        if timer is None:
+            return super().render(context, request)
+        timer["depth"] += 1
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            timer["depth"] -= 1
+            if not timer["depth"]:
+                timer["ms"] += (time.perf_counter() - started) * 1000
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """
+    Бэкенд шаблонов Django, возвращающий TimedTemplate. Подключается
+    в TEMPLATES вместо DjangoTemplates, чтобы замер не подменял
+    Template.render глобально.
+    """
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code).template, self)
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name).template, self)
+
+
+def uses_cached_loader(engine):
+    """
+    Включён ли у движка шаблонов загрузчик cached.Loader.
+    """
+    return any(
+        isinstance(loader, CachedLoader) for loader in engine.engine.template_loaders
+    )
+
+
+def template_names(engine):
+    """
+    Имена всех шаблонов в каталогах движка (DIRS и templates/ приложений).
+    Шаблон, переопределённый в нескольких каталогах, встречается один раз.
+    """
+    names = set()
+    for directory in [*engine.engine.dirs, *get_app_template_dirs("templates")]:
+        for root, _, files in os.walk(directory):
+            for file in files:
+                if not file.startswith("."):
+                    path = os.path.relpath(os.path.join(root, file), directory)
+                    names.add(path.replace(os.sep, "/"))
+    return sorted(names)
+
+
+def warm_templates(force=False):
+    """
+    Компилирует все шаблоны движков Django с кешируемой загрузкой.
+    force — компилировать и без cached.Loader (для проверки синтаксиса
+    и замера). Возвращает {имя шаблона: время компиляции в мс или
+    текст ошибки}.
+    """
+    results = {}
+    for engine in engines.all():
+        if not isinstance(engine, DjangoTemplates):
+            continue
+        if not force and not uses_cached_loader(engine):
+            continue
+        for name in template_names(engine):
+            started = time.perf_counter()
+            try:
+                engine.get_template(name)
+            except (TemplateSyntaxError, UnicodeDecodeError) as error:
+                results[name] = str(error)
+            else:
+                results[name] = round((time.perf_counter() - started) * 1000, 3)
+    return results
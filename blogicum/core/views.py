@@ -0,0 +1,12 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+
+from .stats import snapshot
+
+
+@staff_member_required
+def request_stats(request):
+    """
+    Статистика запросов по представлениям (только для персонала).
+    """
+    return JsonResponse(snapshot(), json_dumps_params={"ensure_ascii": False})